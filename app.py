@@ -1,14 +1,29 @@
 import os  # The 'os' module allows interaction with the operating system, here used to retrieve environment variables.
+import base64  # Used to decode uploaded CSV files.
+import csv  # Used to recognise uploaded files that are not valid CSV.
 import dash  # 'dash' is the main package used to create interactive web applications in Python.
 from dash import dcc, html  # 'dcc' provides dashboard components, and 'html' allows HTML elements to be used in the app.
 from dash.dependencies import Input, Output  # 'Input' and 'Output' manage how user interactions update the UI.
 import plotly.express as px  # 'plotly.express' is used to easily create graphs, especially for time series data.
+import plotly.graph_objects as go  # 'plotly.graph_objects' is used to draw the min/max band of the historical graph.
+import pandas as pd  # 'pandas' is used to read the zoomed time range of the historical graph.
 from datetime import datetime, timezone, timedelta  # Importing functions to manage and manipulate dates and times.
 
 # Import custom functions from other modules to handle fetching and processing weather data.
-from weather.current_weather import get_weather_by_coordinates, process_weather_data, get_city_coordinates
-from weather.forecast import get_forecast_by_coordinates, process_forecast_data
-from weather.historical_weather import get_historical_weather, process_historical_weather_data
+from weather.current_weather import get_city_coordinates
+from weather.forecast import process_forecast_data
+from weather.concurrent_fetch import fetch_dashboard_data  # Runs the current, forecast and history requests in parallel.
+from weather.history_store import get_history_store  # Reads full-resolution history from disk when the user zooms in.
+from weather.aggregation import aggregate_for_display  # Resamples and downsamples long time series before they are plotted.
+from weather.cache import MemoryBackend  # Bounded LRU store reused here to memoize the generated figures.
+from weather.units import convert_current_weather, convert_frame  # Converts the cached metric data to Fahrenheit locally.
+from weather.batch import parse_city_list, parse_locations_csv, geocode_cities, fetch_batch  # Fetches many locations concurrently.
+from weather.prefetch import PrefetchScheduler  # Keeps the cached data of the most requested cities warm in the background.
+from weather import config  # Shared settings (prefetch and metrics on/off).
+from weather import metrics  # Per-stage latency histograms (fetch, process, figure build, serialization).
+from weather.cache import get_cache  # Response cache, whose hit rate is reported at '/metrics'.
+from weather.http_client import get_client  # Shared HTTP client, whose connection counts are reported at '/metrics'.
+from flask import Response, jsonify, request  # Used to serve the prefetch status and metrics next to the Dash app.
 
 # --- Task: Setting up environment variables and initializing the app ---
 
@@ -21,6 +36,43 @@ if not api_key:  # This condition checks if the API key was retrieved successful
 # Initialize Dash app
 app = dash.Dash(__name__)  # Initializes the Dash app instance, which serves as the main object for the app.
 
+# Background prefetch of the most requested cities (started by the first dashboard request, never on the request path)
+prefetcher = PrefetchScheduler(api_key)  # Tracks query frequency per city and refreshes their cached data before it expires.
+
+
+@app.server.route('/status/prefetch')  # Plain HTTP endpoint next to the Dash app.
+def prefetch_status():  # Reports the cache hit rate, refresh lag and API budget use of the prefetch scheduler.
+    return jsonify(prefetcher.stats())
+
+
+# Per-stage timing of Dash callback requests (always recorded; cheap compared to the work being timed)
+@app.server.before_request
+def start_request_timer():  # Notes when a callback request arrives.
+    if request.path.endswith('/_dash-update-component'):
+        metrics.start_request()
+
+
+@app.server.after_request
+def record_request_time(response):  # Records how long Dash spent serializing the callback output and the whole request.
+    if request.path.endswith('/_dash-update-component'):
+        metrics.finish_request()
+    return response
+
+
+if config.METRICS_ENABLED:  # Optional Prometheus-style endpoint, enabled with WEATHER_METRICS=1.
+    @app.server.route('/metrics')
+    def metrics_endpoint():  # Serves the stage histograms plus cache and HTTP client counters.
+        cache_stats, client_stats = get_cache().stats(), get_client().stats()
+        counters = {
+            "weather_cache_hits_total": ("Responses served from the cache.", cache_stats['hits']),
+            "weather_cache_misses_total": ("Responses fetched from the API.", cache_stats['misses']),
+            "weather_cache_coalesced_total": ("Requests that waited for an identical request in flight.", cache_stats['coalesced']),
+            "weather_http_requests_total": ("Requests sent to the API.", client_stats['requests']),
+            "weather_http_errors_total": ("API requests that failed.", client_stats['errors']),
+            "weather_http_connections_opened_total": ("Connections opened to the API.", client_stats['connections_opened']),
+        }
+        return Response(metrics.render_prometheus(counters), mimetype='text/plain; version=0.0.4')
+
 # --- Task: Defining the layout of the application ---
 
 # Define the layout
@@ -48,79 +100,386 @@ app.layout = html.Div([  # The main container (a div element) that holds all the
         ),
     ], style={'textAlign': 'center', 'padding': '10px 0'}),  # Centers the dropdown and adds some padding around it.
 
+    # Historical range selection dropdown
+    html.Div([  # A div container for the dropdown to choose how many days of history to show.
+        html.Label("Select history range:", style={'margin-right': '10px'}),  # Label describing the dropdown's purpose.
+        dcc.Dropdown(  # Dropdown menu allowing the user to select the length of the history graph.
+            id='history-range-dropdown',
+            options=[  # The available options for the dropdown (number of days).
+                {'label': 'Last 5 days', 'value': 5},
+                {'label': 'Last 30 days', 'value': 30},
+                {'label': 'Last 90 days', 'value': 90},
+                {'label': 'Last 365 days', 'value': 365}
+            ],
+            value=5,  # The default selection is the last 5 days.
+            clearable=False,  # A range must always be selected.
+            style={'width': '200px', 'margin': '0 auto'}  # The dropdown has a fixed width and is centered horizontally.
+        ),
+    ], style={'textAlign': 'center', 'padding': '10px 0'}),  # Centers the dropdown and adds some padding around it.
+
+    # Historical resolution selection dropdown
+    html.Div([  # A div container for the dropdown to choose how the history graph is aggregated.
+        html.Label("Select history resolution:", style={'margin-right': '10px'}),  # Label describing the dropdown's purpose.
+        dcc.Dropdown(  # Dropdown menu allowing the user to select the bucket size of the history graph.
+            id='history-resolution-dropdown',
+            options=[  # The available options for the dropdown.
+                {'label': 'Automatic', 'value': 'auto'},  # Finest min/mean/max bands that fit the graph width.
+                {'label': 'Full resolution', 'value': 'raw'},  # The hourly line, thinned out to the graph width.
+                {'label': 'Hourly bands', 'value': 'hourly'},
+                {'label': 'Daily bands', 'value': 'daily'},
+                {'label': 'Weekly bands', 'value': 'weekly'}
+            ],
+            value='auto',  # The default selection picks the bucket size automatically.
+            clearable=False,  # A resolution must always be selected.
+            style={'width': '200px', 'margin': '0 auto'}  # The dropdown has a fixed width and is centered horizontally.
+        ),
+    ], style={'textAlign': 'center', 'padding': '10px 0'}),  # Centers the dropdown and adds some padding around it.
+
+    # Browser-side values used when building the graphs
+    dcc.Store(id='graph-width'),  # Width of the browser window in pixels, used as the target number of points per graph.
+    dcc.Store(id='weather-data'),  # Current weather and forecast (always metric) shared by the panels, so panels never call the API themselves.
+    dcc.Store(id='history-data'),  # Location and range of the history held in the local store; filled separately so a long backfill never delays the other panels.
+    dcc.Store(id='history-zoom'),  # Last zoom of the historical graph, tagged with the location and data version it was made on.
+
     # Container to display current weather information
     html.Div(id='current-weather-output', style={'padding': '20px', 'text-align': 'center', 'font-size': '18px'}),  # A div where the current weather data will be displayed in table form.
 
     # Graphs for forecast and historical weather
     dcc.Graph(id='forecast-graph'),  # This component will display the 5-day forecast as a graph.
-    dcc.Graph(id='historical-weather-graph')  # This component will display the historical weather data as a graph.
+    dcc.Graph(id='historical-weather-graph'),  # This component will display the historical weather data as a graph.
+
+    # Multi-city comparison
+    html.Hr(),  # Separates the single-city dashboard from the comparison section.
+    html.H2("Multi-City Comparison", style={'textAlign': 'center'}),  # Title of the comparison section.
+    html.Div([  # Div container that groups the ways of entering several locations.
+        html.Label("Enter cities separated by commas or new lines:", style={'display': 'block', 'margin-bottom': '5px'}),  # A label prompting the user to enter several cities.
+        dcc.Textarea(id='multi-city-input', value='London, Paris, Berlin', style={'width': '60%', 'height': '80px'}),  # Text area for the list of cities.
+        dcc.Upload(  # Lets the user upload a CSV file with 'lat' and 'lon' columns (and an optional 'name' column).
+            id='locations-upload',
+            children=html.Div(["Or drop / ", html.A("select a CSV file"), " with lat, lon (and name) columns"]),
+            style={'width': '60%', 'margin': '10px auto', 'padding': '10px', 'border': '1px dashed #aaa'}
+        ),
+        html.Div(id='locations-upload-status'),  # Shows how many locations were read from the uploaded file.
+        dcc.RadioItems(  # Choice between one combined graph and one small graph per location.
+            id='comparison-layout',
+            options=[{'label': 'Overlay', 'value': 'overlay'}, {'label': 'Small multiples', 'value': 'small-multiples'}],
+            value='overlay',  # The default shows every location on one graph.
+            inline=True,
+            style={'padding': '10px 0'}
+        ),
+        html.Button('Compare', id='compare-button', n_clicks=0),  # Starts fetching the forecast of every location.
+    ], style={'textAlign': 'center', 'padding': '20px 0'}),  # Center-aligns the comparison inputs.
+    dcc.Store(id='comparison-data'),  # Long-format forecast data (always metric) of every compared location.
+    dcc.Graph(id='comparison-graph')  # This component will display the forecasts of every location.
 ])
 
-# --- Task: Defining the callback for updating weather data and graphs ---
+# --- Task: Sizing graphs to the browser window ---
+
+# Stores the browser window width so graphs are never sent more points than there are pixels to draw them.
+app.clientside_callback(
+    "function(n_clicks) { return window.innerWidth; }",
+    Output('graph-width', 'data'),
+    Input('submit-button', 'n_clicks')
+)
+
+
+def get_target_points(graph_width):  # Number of points worth sending for a graph of the given width.
+    return max(int(graph_width or 1000), 200)  # One point per pixel, with a sensible minimum.
+
+
+def temperature_label(unit_system):  # Axis label matching the selected temperature unit.
+    return "Temperature (°F)" if unit_system == 'imperial' else "Temperature (°C)"
+
+
+# --- Task: Memoizing generated figures ---
+
+_figures = MemoryBackend(max_entries=256)  # Recently built figures, keyed by panel, city, units, data version and view settings.
+FIGURE_TTL = 24 * 3600  # Figures are keyed by data version, so they only expire to free memory.
+
+
+def get_or_build_figure(key, build):  # Returns the figure stored under 'key', building and storing it on first use.
+    entry = _figures.get(key)
+    if entry is not None:  # The same view of the same data was built before.
+        return entry[0]
+    figure = build()  # Builds the figure; two callbacks racing on the same key simply both build it.
+    _figures.set(key, figure, FIGURE_TTL)
+    return figure
+
+
+# --- Task: Building the panels from the shared data ---
+
+def build_current_weather_table(weather_data, unit_system):  # Creates the table of current weather parameters.
+    weather_data = convert_current_weather(weather_data, unit_system)  # Converts the cached metric values if Fahrenheit is selected.
+    speed_unit = "mph" if unit_system == 'imperial' else "m/s"  # Wind speed unit matching the selected system.
+    return html.Table([  # Constructs an HTML table to display the weather parameters and values.
+        html.Thead(html.Tr([html.Th("Weather Parameter"), html.Th("Value")]),  # Defines the table header with two columns: "Weather Parameter" and "Value".
+                   style={'backgroundColor': '#4CAF50', 'color': 'white'}),  # Styles the header with a green background and white text.
+        html.Tbody([  # The body of the table contains the weather data rows.
+            html.Tr([html.Td("Temperature"), html.Td(f"{weather_data['main']['temp']}°")]),  # Row displaying the temperature.
+            html.Tr([html.Td("Feels Like"), html.Td(f"{weather_data['main']['feels_like']}°")]),  # Row displaying what the temperature feels like.
+            html.Tr([html.Td("Min Temperature"), html.Td(f"{weather_data['main']['temp_min']}°")]),  # Row for the minimum temperature.
+            html.Tr([html.Td("Max Temperature"), html.Td(f"{weather_data['main']['temp_max']}°")]),  # Row for the maximum temperature.
+            html.Tr([html.Td("Humidity"), html.Td(f"{weather_data['main']['humidity']}%")]),  # Row displaying the humidity percentage.
+            html.Tr([html.Td("Pressure"), html.Td(f"{weather_data['main']['pressure']} hPa")]),  # Row showing the atmospheric pressure.
+            html.Tr([html.Td("Wind Speed"), html.Td(f"{weather_data['wind']['speed']} {speed_unit}")]),  # Row showing the wind speed.
+            html.Tr([html.Td("Cloudiness"), html.Td(f"{weather_data.get('clouds', {}).get('all', 'N/A')}%")]),  # Row showing cloudiness, if available.
+            html.Tr([html.Td("Sunrise (UTC)"), html.Td(datetime.fromtimestamp(weather_data['sys']['sunrise'], tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S'))]),  # Row for sunrise time in UTC.
+            html.Tr([html.Td("Sunset (UTC)"), html.Td(datetime.fromtimestamp(weather_data['sys']['sunset'], tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S'))])  # Row for sunset time in UTC.
+        ], style={'textAlign': 'left'})  # Aligns the text inside the table to the left.
+    ], style={  # Styles the table container, setting its width, border, and padding.
+        'margin': 'auto', 'width': '60%', 'border': '2px solid #ddd', 'borderCollapse': 'collapse',
+        'padding': '10px', 'textAlign': 'left', 'fontSize': '18px',
+        'border-spacing': '0px', 'table-layout': 'fixed'
+    })
+
+
+def build_forecast_figure(forecast_data, city, unit_system):  # Creates the 5-day forecast graph.
+    with metrics.stage_timer('process'):
+        forecast_df = convert_frame(process_forecast_data(forecast_data), unit_system)  # Processes the forecast data into a pandas DataFrame in the selected units.
+    with metrics.stage_timer('figure'):
+        forecast_fig = px.line(forecast_df, x='datetime', y='temp', title=f"5-Day Forecast for {city}")  # Creates a line graph of the forecasted temperature for the next 5 days.
+        forecast_fig.update_layout(xaxis_title="Date and Time", yaxis_title=temperature_label(unit_system), template="plotly_dark")  # Updates the graph layout, adding axis labels and a dark theme.
+    return forecast_fig
+
+
+def build_historical_figure(historical_df, title, target_points, resolution='auto', unit_system='metric'):  # Creates the historical weather graph from (possibly months of) hourly data.
+    with metrics.stage_timer('process'):
+        display_df, resolution = aggregate_for_display(historical_df, target_points, resolution)  # Resamples and downsamples the data to fit the graph.
+        display_df = convert_frame(display_df, unit_system)  # Converts only the points that are displayed.
+    with metrics.stage_timer('figure'):
+        historical_fig = go.Figure()  # Initializes an empty figure.
+        if resolution != 'raw':  # Draws the min/max band behind the average line.
+            historical_fig.add_trace(go.Scatter(x=display_df['datetime'], y=display_df['temp_max'], mode='lines',
+                                                line={'width': 0}, name='Max', showlegend=False))  # Upper edge of the band.
+            historical_fig.add_trace(go.Scatter(x=display_df['datetime'], y=display_df['temp_min'], mode='lines',
+                                                line={'width': 0}, fill='tonexty', fillcolor='rgba(99, 110, 250, 0.3)',
+                                                name='Min / Max', showlegend=False))  # Lower edge of the band, filled up to the upper edge.
+        historical_fig.add_trace(go.Scatter(x=display_df['datetime'], y=display_df['temp'], mode='lines',
+                                            line={'color': '#636efa'}, name='Average'))  # The average temperature line.
+        historical_fig.update_layout(title=f"{title} ({resolution})", xaxis_title="Date and Time", yaxis_title=temperature_label(unit_system),
+                                     template="plotly_dark", showlegend=False)  # Adds axis labels and a dark theme.
+    return historical_fig  # Returns the finished figure.
+
+
+# --- Task: Fetching the weather data shared by every panel ---
 
-# Callback to update current weather, forecast graph, and historical weather graph
 @app.callback(
-    [Output('current-weather-output', 'children'),  # Updates the content of the 'current-weather-output' div.
-     Output('forecast-graph', 'figure'),  # Updates the figure (graph) for the 'forecast-graph' component.
-     Output('historical-weather-graph', 'figure')],  # Updates the figure (graph) for the 'historical-weather-graph' component.
+    Output('weather-data', 'data'),  # Updates the current weather and forecast; their panels redraw from it.
     [Input('submit-button', 'n_clicks')],  # This callback is triggered when the submit button is clicked.
-    [dash.dependencies.State('city-input', 'value'),  # Gets the current value from the 'city-input' field.
-     dash.dependencies.State('unit-dropdown', 'value')]  # Gets the current value from the 'unit-dropdown' field (Celsius or Fahrenheit).
+    [dash.dependencies.State('city-input', 'value')]  # Gets the current value from the 'city-input' field.
 )
-def update_weather_dashboard(n_clicks, city, unit_system):  # Function that updates weather data when the submit button is clicked.
-    coordinates = get_city_coordinates(city, api_key)  # Retrieves the latitude and longitude of the city entered by the user.
-    if coordinates:  # If coordinates are found for the given city...
+@metrics.timed_callback  # Lets the request hooks measure how long Dash spends serializing the output.
+def update_weather_dashboard(n_clicks, city):  # Function that fetches the current weather and forecast when the submit button is clicked.
+    with metrics.stage_timer('fetch'):  # Geocoding plus the parallel API requests.
+        coordinates = get_city_coordinates(city, api_key)  # Retrieves the latitude and longitude of the city entered by the user.
+        if not coordinates:  # If no coordinates are found for the given city...
+            return None  # Clears the store so every panel shows that no data is available.
         lat, lon = coordinates['lat'], coordinates['lon']  # Extracts the latitude and longitude from the coordinates.
+        if config.PREFETCH_ENABLED:  # Counts the query so popular cities are kept warm in the cache.
+            prefetcher.record_query(city, lat, lon)
+
+        # Fetch current weather and forecast in parallel, always in metric units (history is fetched by its own callback)
+        results = fetch_dashboard_data(lat, lon, None, None, api_key, units='metric', parts=("current", "forecast"))  # Slow or failed parts come back as None.
+
+    # The version changes only when the underlying data does, so unchanged resubmits reuse the memoized figures.
+    current_version = results['current']['dt'] if results['current'] else None  # Time of the current weather observation.
+    forecast_version = results['forecast']['list'][0]['dt'] if results['forecast'] and results['forecast']['list'] else None  # Time of the first forecast entry.
+    return {
+        'city': city, 'lat': lat, 'lon': lon,  # The location that was requested.
+        'current': results['current'],  # The current weather payload (metric).
+        'forecast': results['forecast'],  # The forecast payload (metric).
+        'version': f"{current_version}-{forecast_version}",  # Identifies this version of the data.
+    }
+
+
+@app.callback(
+    Output('history-data', 'data'),  # Updates the history range; the historical graph redraws from it.
+    [Input('submit-button', 'n_clicks')],  # Runs next to 'update_weather_dashboard', not after it.
+    [dash.dependencies.State('city-input', 'value'),  # Gets the current value from the 'city-input' field.
+     dash.dependencies.State('history-range-dropdown', 'value')]  # Gets the number of days of history to display.
+)
+@metrics.timed_callback
+def update_history_data(n_clicks, city, history_days=5):  # Brings the local store up to date for the last N days, within its own time budget.
+    with metrics.stage_timer('fetch'):
+        coordinates = get_city_coordinates(city, api_key)  # Shares the cached (or in-flight) geocoding request of the other callback.
+        if not coordinates:
+            return None
+        lat, lon = coordinates['lat'], coordinates['lon']
+        now = datetime.now(tz=timezone.utc).replace(minute=0, second=0, microsecond=0)  # The start of the current hour, so repeated clicks reuse the cached history.
+        end_time = int(now.timestamp())  # Gets the current timestamp in UTC.
+        start_time = int((now - timedelta(days=history_days)).timestamp())  # Calculates the timestamp for the start of the selected range.
+        results = fetch_dashboard_data(lat, lon, start_time, end_time, api_key, units='metric', parts=("history",))  # Backfills the missing hours, up to HISTORY_FETCH_TIMEOUT.
+
+    history_rows = len(results['history']) if results['history'] is not None else 0  # Number of hours of history available.
+    return {
+        'city': city, 'lat': lat, 'lon': lon, 'days': history_days,  # The location and range that were requested.
+        'start': start_time, 'end': end_time,  # The history range, read back from the local store by the history panel.
+        'version': f"{end_time}-{history_rows}",  # Identifies this version of the data.
+    }
+
+
+# --- Task: One callback per panel, redrawn from the shared data ---
 
-        # Fetch and display current weather data
-        weather_data = get_weather_by_coordinates(lat, lon, api_key, units=unit_system)  # Fetches current weather data using the city’s coordinates and the chosen temperature unit.
-        if weather_data:  # If weather data is retrieved successfully...
-            # Structure the current weather data into a table with styling
-            current_weather_output = html.Table([  # Constructs an HTML table to display the weather parameters and values.
-                html.Thead(html.Tr([html.Th("Weather Parameter"), html.Th("Value")]),  # Defines the table header with two columns: "Weather Parameter" and "Value".
-                           style={'backgroundColor': '#4CAF50', 'color': 'white'}),  # Styles the header with a green background and white text.
-                html.Tbody([  # The body of the table contains the weather data rows.
-                    html.Tr([html.Td("Temperature"), html.Td(f"{weather_data['main']['temp']}°")]),  # Row displaying the temperature.
-                    html.Tr([html.Td("Feels Like"), html.Td(f"{weather_data['main']['feels_like']}°")]),  # Row displaying what the temperature feels like.
-                    html.Tr([html.Td("Min Temperature"), html.Td(f"{weather_data['main']['temp_min']}°")]),  # Row for the minimum temperature.
-                    html.Tr([html.Td("Max Temperature"), html.Td(f"{weather_data['main']['temp_max']}°")]),  # Row for the maximum temperature.
-                    html.Tr([html.Td("Humidity"), html.Td(f"{weather_data['main']['humidity']}%")]),  # Row displaying the humidity percentage.
-                    html.Tr([html.Td("Pressure"), html.Td(f"{weather_data['main']['pressure']} hPa")]),  # Row showing the atmospheric pressure.
-                    html.Tr([html.Td("Wind Speed"), html.Td(f"{weather_data['wind']['speed']} m/s")]),  # Row showing the wind speed.
-                    html.Tr([html.Td("Cloudiness"), html.Td(f"{weather_data.get('clouds', {}).get('all', 'N/A')}%")]),  # Row showing cloudiness, if available.
-                    html.Tr([html.Td("Sunrise (UTC)"), html.Td(datetime.fromtimestamp(weather_data['sys']['sunrise'], tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S'))]),  # Row for sunrise time in UTC.
-                    html.Tr([html.Td("Sunset (UTC)"), html.Td(datetime.fromtimestamp(weather_data['sys']['sunset'], tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S'))])  # Row for sunset time in UTC.
-                ], style={'textAlign': 'left'})  # Aligns the text inside the table to the left.
-            ], style={  # Styles the table container, setting its width, border, and padding.
-                'margin': 'auto', 'width': '60%', 'border': '2px solid #ddd', 'borderCollapse': 'collapse',
-                'padding': '10px', 'textAlign': 'left', 'fontSize': '18px',
-                'border-spacing': '0px', 'table-layout': 'fixed'
-            })
-        else:  # If no weather data is available...
-            current_weather_output = "No data available"  # Displays a message indicating that no data is available.
-
-        # Fetch and process 5-day forecast data
-        forecast_data = get_forecast_by_coordinates(lat, lon, api_key, units=unit_system)  # Fetches the 5-day weather forecast data.
-        forecast_fig = {}  # Initializes an empty dictionary for the forecast graph.
-        if forecast_data:  # If forecast data is available...
-            forecast_df = process_forecast_data(forecast_data)  # Processes the forecast data into a pandas DataFrame.
-            forecast_fig = px.line(forecast_df, x='datetime', y='temp', title=f"5-Day Forecast for {city}")  # Creates a line graph of the forecasted temperature for the next 5 days.
-            forecast_fig.update_layout(xaxis_title="Date and Time", yaxis_title="Temperature", template="plotly_dark")  # Updates the graph layout, adding axis labels and a dark theme.
-
-        # Fetch and process historical weather data (last 5 days)
-        end_time = int(datetime.now(tz=timezone.utc).timestamp())  # Gets the current timestamp in UTC.
-        start_time = int((datetime.now(tz=timezone.utc) - timedelta(days=5)).timestamp())  # Calculates the timestamp for 5 days ago.
-        historical_data = get_historical_weather(lat, lon, start_time, end_time, api_key, units=unit_system)  # Fetches the historical weather data for the last 5 days.
-        historical_fig = {}  # Initializes an empty dictionary for the historical weather graph.
-        if historical_data:  # If historical weather data is available...
-            historical_df = process_historical_weather_data(historical_data)  # Processes the historical weather data into a DataFrame.
-            historical_fig = px.line(historical_df, x='datetime', y='temp',
-                                     title=f"Historical Weather Data for {city} - Last 5 Days")  # Creates a line graph for the last 5 days of weather data.
-            historical_fig.update_layout(xaxis_title="Date and Time", yaxis_title="Temperature", template="plotly_dark")  # Updates the graph with axis labels and a dark theme.
-
-        return current_weather_output, forecast_fig, historical_fig  # Returns the current weather, forecast, and historical weather figures.
-
-    return "No data available", {}, {}  # Returns default values if no coordinates or data were found.
+@app.callback(
+    Output('current-weather-output', 'children'),  # Updates the content of the 'current-weather-output' div.
+    [Input('weather-data', 'data'),  # Triggered when new data has been fetched.
+     Input('unit-dropdown', 'value')]  # Triggered when the user switches between Celsius and Fahrenheit.
+)
+@metrics.timed_callback
+def update_current_weather(weather_data, unit_system):  # Redraws the current weather table.
+    if not weather_data or not weather_data['current']:  # If no weather data is available...
+        return "No data available"  # Displays a message indicating that no data is available.
+    with metrics.stage_timer('figure'):
+        return build_current_weather_table(weather_data['current'], unit_system)
+
+
+@app.callback(
+    Output('forecast-graph', 'figure'),  # Updates the figure (graph) for the 'forecast-graph' component.
+    [Input('weather-data', 'data'),  # Triggered when new data has been fetched.
+     Input('unit-dropdown', 'value')]  # Triggered when the user switches between Celsius and Fahrenheit.
+)
+@metrics.timed_callback
+def update_forecast_graph(weather_data, unit_system):  # Redraws the 5-day forecast graph.
+    if not weather_data or not weather_data['forecast']:  # If no forecast data is available...
+        return {}  # Returns an empty graph.
+    key = ('forecast', weather_data['city'], unit_system, weather_data['version'])  # Identifies this figure in the figure cache.
+    return get_or_build_figure(repr(key), lambda: build_forecast_figure(weather_data['forecast'], weather_data['city'], unit_system))
+
+
+def parse_zoom_range(relayout_data):  # Returns the (start, end) timestamps of a zoom event, 'reset' for a double-click, or None.
+    if not relayout_data:
+        return None
+    if relayout_data.get('xaxis.autorange'):  # The user double-clicked to reset the zoom.
+        return 'reset'
+    x_range = relayout_data.get('xaxis.range') or [relayout_data.get('xaxis.range[0]'), relayout_data.get('xaxis.range[1]')]
+    if x_range[0] is None or x_range[1] is None:  # Not a zoom on the time axis (e.g. the graph was resized).
+        return None
+    start, end = (pd.Timestamp(value) for value in x_range)  # Plotly reports the range as UTC strings without a time zone.
+    return int(start.tz_localize('UTC').timestamp()), int(end.tz_localize('UTC').timestamp())
+
+
+@app.callback(
+    [Output('historical-weather-graph', 'figure'),  # Updates the figure (graph) for the 'historical-weather-graph' component.
+     Output('history-zoom', 'data')],  # Remembers the zoom, or forgets it when new data arrives.
+    [Input('history-data', 'data'),  # Triggered when the history has been brought up to date.
+     Input('unit-dropdown', 'value'),  # Triggered when the user switches between Celsius and Fahrenheit.
+     Input('history-resolution-dropdown', 'value'),  # Triggered when the user picks another resolution.
+     Input('historical-weather-graph', 'relayoutData')],  # Triggered when the user zooms or resets the zoom.
+    [dash.dependencies.State('graph-width', 'data'),  # The browser window width.
+     dash.dependencies.State('history-zoom', 'data')]  # The last zoom, if it was made on the same data.
+)
+@metrics.timed_callback
+def update_historical_graph(history_data, unit_system, resolution, relayout_data, graph_width, zoom_state):  # Redraws the historical graph from the local store; zooming shows the visible range at full resolution.
+    if not history_data:  # If no history has been fetched...
+        return {}, dash.no_update  # Returns an empty graph.
+    start, end = history_data['start'], history_data['end']  # The full range by default.
+    data_key = [history_data['lat'], history_data['lon'], history_data['version']]  # Identifies the data a zoom was made on.
+    if dash.ctx.triggered_id == 'historical-weather-graph':  # Only a zoom event itself is read from 'relayoutData'.
+        zoom = parse_zoom_range(relayout_data)
+        if zoom is None:  # Ignores layout events that are not zooms.
+            return dash.no_update, dash.no_update
+        zoom_state = {'data': data_key, 'zoom': zoom}  # Remembered for unit and resolution changes.
+    elif dash.ctx.triggered_id == 'history-data':  # New data always starts from the full range.
+        zoom, zoom_state = None, None
+    else:  # Keeps the last zoom only if it was made on this data.
+        zoom = zoom_state['zoom'] if zoom_state and zoom_state['data'] == data_key else None
+        zoom_state = dash.no_update
+    if zoom not in (None, 'reset'):  # Limits the data to the visible range.
+        start, end = max(start, zoom[0]), min(end, zoom[1])
+
+    target_points = get_target_points(graph_width)  # One point per pixel of the graph.
+    key = ('history', history_data['city'], unit_system, history_data['version'], resolution, target_points, start, end)  # Identifies this figure in the figure cache.
+
+    def build():
+        with metrics.stage_timer('fetch'):
+            historical_df = get_history_store().read_range(history_data['lat'], history_data['lon'], 'metric', start, end)  # Full-resolution hours from disk; no API call.
+        if historical_df.empty:
+            return {}
+        title = f"Historical Weather Data for {history_data['city']} - Last {history_data['days']} Days"
+        historical_fig = build_historical_figure(historical_df, title, target_points, resolution, unit_system)
+        if zoom not in (None, 'reset'):
+            historical_fig.update_xaxes(range=[pd.Timestamp(start, unit='s'), pd.Timestamp(end, unit='s')])  # Keeps the zoomed view.
+        return historical_fig
+
+    return get_or_build_figure(repr(key), build), zoom_state
+
+
+# --- Task: Comparing many cities side by side ---
+
+def decode_upload(contents):  # Returns the text of a file uploaded through 'dcc.Upload' (sent as a base64 data URL).
+    content_type, content_string = contents.split(',', 1)  # Splits off the 'data:text/csv;base64' prefix.
+    return base64.b64decode(content_string).decode('utf-8-sig')  # Decodes the file, ignoring a byte-order mark if present.
+
+
+def read_upload_locations(contents):  # Returns the locations of an uploaded CSV file, or None if the file cannot be read.
+    try:
+        return parse_locations_csv(decode_upload(contents))
+    except (ValueError, csv.Error) as exc:  # Not base64, not UTF-8 text (UnicodeDecodeError is a ValueError) or not valid CSV.
+        print(f"Error reading uploaded file: {exc}")
+        return None
+
+
+@app.callback(
+    Output('locations-upload-status', 'children'),  # Tells the user what was read from the uploaded file.
+    [Input('locations-upload', 'contents')],  # Triggered when a file is uploaded.
+    [dash.dependencies.State('locations-upload', 'filename')]  # The name of the uploaded file.
+)
+@metrics.timed_callback
+def update_upload_status(contents, filename):  # Confirms how many locations were found in the uploaded CSV file.
+    if not contents:
+        return ""
+    locations = read_upload_locations(contents)
+    if locations is None:  # Tells the user instead of failing the callback.
+        return f"Could not read file {filename}: please upload a UTF-8 encoded CSV file"
+    return f"{len(locations)} locations read from {filename}"
+
+
+@app.callback(
+    Output('comparison-data', 'data'),  # Updates the shared comparison data.
+    [Input('compare-button', 'n_clicks')],  # This callback is triggered when the compare button is clicked.
+    [dash.dependencies.State('multi-city-input', 'value'),  # The list of cities typed by the user.
+     dash.dependencies.State('locations-upload', 'contents')],  # The uploaded CSV file, if any.
+    prevent_initial_call=True
+)
+@metrics.timed_callback
+def update_comparison_data(n_clicks, city_text, upload_contents):  # Geocodes and fetches every location concurrently under the API rate limit.
+    with metrics.stage_timer('fetch'):
+        locations = geocode_cities(parse_city_list(city_text), api_key)  # Coordinates of the typed cities.
+        if upload_contents:  # Adds the locations of the uploaded file.
+            locations += read_upload_locations(upload_contents) or []  # An unreadable file adds nothing (its status message says why).
+        if not locations:  # If none of the locations could be found...
+            return None
+        batch_df = fetch_batch(locations, api_key, kinds=("forecast",), units='metric')  # One long-format DataFrame for every location.
+        if batch_df.empty:  # Every forecast request failed (e.g. an API outage or an invalid key).
+            return None
+    with metrics.stage_timer('process'):
+        batch_df['datetime'] = batch_df['datetime'].dt.strftime('%Y-%m-%d %H:%M:%S')  # Makes the timestamps JSON-friendly for the browser store.
+        return batch_df[['location', 'datetime', 'temp']].to_dict('records')  # Only the columns needed by the graph are sent to the browser.
+
+
+@app.callback(
+    Output('comparison-graph', 'figure'),  # Updates the figure (graph) for the 'comparison-graph' component.
+    [Input('comparison-data', 'data'),  # Triggered when new comparison data has been fetched.
+     Input('unit-dropdown', 'value'),  # Triggered when the user switches between Celsius and Fahrenheit.
+     Input('comparison-layout', 'value')]  # Triggered when the user switches between overlay and small multiples.
+)
+@metrics.timed_callback
+def update_comparison_graph(comparison_data, unit_system, layout):  # Redraws the comparison graph from the shared data.
+    if not comparison_data:  # If no comparison data is available...
+        return {}  # Returns an empty graph.
+    with metrics.stage_timer('process'):
+        comparison_df = convert_frame(pd.DataFrame(comparison_data), unit_system)  # Converts the metric data if Fahrenheit is selected.
+    with metrics.stage_timer('figure'):
+        if layout == 'small-multiples':  # One small graph per location, four per row.
+            rows = (comparison_df['location'].nunique() + 3) // 4  # Number of rows of graphs.
+            comparison_fig = px.line(comparison_df, x='datetime', y='temp', facet_col='location', facet_col_wrap=4,
+                                     facet_row_spacing=min(0.08, 1 / max(rows, 1) - 0.01), height=max(300, 220 * rows),
+                                     title="5-Day Forecast Comparison")
+            comparison_fig.for_each_annotation(lambda annotation: annotation.update(text=annotation.text.split('=', 1)[-1]))  # Shows only the location name above each graph.
+        else:  # Every location on a single graph.
+            comparison_fig = px.line(comparison_df, x='datetime', y='temp', color='location', title="5-Day Forecast Comparison")
+        comparison_fig.update_layout(yaxis_title=temperature_label(unit_system), template="plotly_dark")  # Adds the temperature axis label and a dark theme.
+    return comparison_fig
 
 
 # --- Task: Running the app ---
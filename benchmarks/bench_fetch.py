@@ -0,0 +1,96 @@
+import os  # Used to point the weather package at the local stub server.
+import statistics  # Used to summarise the measured latencies.
+import shutil  # Removes the throw-away history store of each run.
+import tempfile  # Keeps any history store written during the benchmark out of the working directory.
+import time  # Used to time each dashboard request.
+from datetime import datetime, timezone, timedelta  # Used to build the 5-day history window, as the dashboard does.
+
+from benchmarks.stub_server import start_stub_server  # Local stand-in for the OpenWeatherMap APIs.
+
+# --- Task: Starting the stub server before the weather package reads its settings ---
+
+# Simulated round-trip time per endpoint; the history API is deliberately the slowest.
+LATENCY = {
+    "/geo/1.0/direct": 0.05,
+    "/data/2.5/weather": 0.08,
+    "/data/2.5/forecast": 0.12,
+    "/data/2.5/history/city": 0.30,
+}
+
+server = start_stub_server(LATENCY)  # Starts the stub server on a free local port.
+base_url = f"http://{server.server_address[0]}:{server.server_address[1]}"  # Address of the stub server.
+os.environ["WEATHER_API_BASE_URL"] = base_url  # Sends geocoding, current and forecast requests to the stub.
+os.environ["WEATHER_HISTORY_BASE_URL"] = base_url  # Sends history requests to the stub.
+os.environ["WEATHER_HISTORY_STORE_DIR"] = tempfile.mkdtemp(prefix="weather-bench-")  # Never writes into the repository.
+
+from weather.current_weather import get_city_coordinates, get_weather_by_coordinates  # noqa: E402
+from weather.forecast import get_forecast_by_coordinates  # noqa: E402
+from weather.historical_weather import get_historical_weather  # noqa: E402
+from weather.concurrent_fetch import fetch_dashboard_data  # noqa: E402
+from weather.history_store import configure_history_store, get_history_store  # noqa: E402
+from weather.http_client import get_client  # noqa: E402
+from weather.cache import configure_cache, get_cache  # noqa: E402
+
+API_KEY = "benchmark"  # The stub server does not check the API key.
+
+
+# --- Task: The two fetch strategies being compared ---
+
+def _history_window():  # The last 5 days, exactly as the dashboard requests them.
+    now = datetime.now(tz=timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return int((now - timedelta(days=5)).timestamp()), int(now.timestamp())
+
+
+def fetch_sequential(city):  # The original callback: four blocking requests one after another.
+    coordinates = get_city_coordinates(city, API_KEY)
+    lat, lon = coordinates['lat'], coordinates['lon']
+    start, end = _history_window()
+    get_weather_by_coordinates(lat, lon, API_KEY)
+    get_forecast_by_coordinates(lat, lon, API_KEY)
+    get_historical_weather(lat, lon, start, end, API_KEY)
+
+
+def fetch_concurrent(city):  # The dashboard's own fan-out: geocode, then current, forecast and history in parallel.
+    coordinates = get_city_coordinates(city, API_KEY)
+    lat, lon = coordinates['lat'], coordinates['lon']
+    start, end = _history_window()
+    fetch_dashboard_data(lat, lon, start, end, API_KEY)
+
+
+def fresh_history_store():  # Points the dashboard at an empty history store, so history comes from the API as in the sequential strategy.
+    shutil.rmtree(get_history_store().root, ignore_errors=True)  # Removes the store of the previous run.
+    configure_history_store(tempfile.mkdtemp(prefix="weather-bench-"))
+
+
+# --- Task: Measuring end-to-end latency ---
+
+def measure(fetch, iterations, setup=None):  # Runs one strategy several times and returns the latencies in milliseconds.
+    fetch("London")  # Warm-up run so thread start-up is not counted.
+    timings = []
+    for _ in range(iterations):
+        if setup:  # Prepares the run outside the timed part.
+            setup()
+        started = time.perf_counter()
+        fetch("London")
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name, timings):  # Prints the median and worst latency of one strategy.
+    print(f"{name:<12} median {statistics.median(timings):8.1f} ms   max {max(timings):8.1f} ms")
+
+
+if __name__ == '__main__':
+    iterations = int(os.getenv("BENCH_ITERATIONS", "20"))  # Number of measured dashboard requests per strategy.
+    print(f"Stub latency per endpoint (s): {LATENCY}")
+    configure_cache(ttls={"geocode": 0, "current": 0, "forecast": 0, "history": 0})  # Every request goes to the stub server.
+    sequential = measure(fetch_sequential, iterations)
+    concurrent = measure(fetch_concurrent, iterations, setup=fresh_history_store)
+    configure_cache("memory")  # Repeated requests are answered from the response cache.
+    cached = measure(fetch_concurrent, iterations)  # The history store is kept too, as in the running dashboard.
+    report("sequential", sequential)
+    report("concurrent", concurrent)
+    report("cached", cached)
+    print(f"speed-up     {statistics.median(sequential) / statistics.median(concurrent):8.2f}x")
+    print(f"Cache        {get_cache().stats()}")
+    print(f"HTTP client  {get_client().stats()}")
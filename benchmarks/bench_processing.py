@@ -0,0 +1,46 @@
+import os  # Used to read the benchmark size from the environment.
+import statistics  # Used to summarise the measured timings.
+import time  # Used to time each run.
+
+import pandas as pd  # Used by the previous row-by-row implementation.
+
+from benchmarks.stub_server import history_payload  # Builds a realistic history payload of any length.
+from weather.historical_weather import process_historical_weather_data  # The columnar implementation being measured.
+
+
+# --- Task: The previous row-by-row implementation, kept for comparison ---
+
+def process_row_by_row(weather_data):  # Loops over every entry and builds one dictionary per row.
+    processed_data = []
+    for item in weather_data['list']:
+        from datetime import datetime
+        dt = datetime.utcfromtimestamp(item['dt']).strftime('%Y-%m-%d %H:%M:%S')
+        processed_data.append({'datetime': dt, 'temp': item['main']['temp'],
+                               'temp_min': item['main']['temp_min'], 'temp_max': item['main']['temp_max']})
+    return pd.DataFrame(processed_data)
+
+
+# --- Task: Measuring both implementations on a multi-month payload ---
+
+def measure(process, payload, iterations):  # Returns the run times of one implementation in milliseconds.
+    process(payload)  # Warm-up run.
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        process(payload)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+if __name__ == '__main__':
+    days = int(os.getenv("BENCH_DAYS", "1825"))  # Length of the history payload (hourly entries).
+    iterations = int(os.getenv("BENCH_ITERATIONS", "5"))  # Number of measured runs per implementation.
+    end = int(time.time()) // 3600 * 3600
+    payload = history_payload({"start": [end - days * 24 * 3600], "end": [end]})  # One entry per hour for the whole range.
+    print(f"History payload: {days} days, {len(payload['list'])} rows")
+
+    row_by_row = measure(process_row_by_row, payload, iterations)
+    columnar = measure(process_historical_weather_data, payload, iterations)
+    print(f"row-by-row   median {statistics.median(row_by_row):8.1f} ms   (4 columns)")
+    print(f"columnar     median {statistics.median(columnar):8.1f} ms   ({process_historical_weather_data(payload).shape[1]} columns)")
+    print(f"speed-up     {statistics.median(row_by_row) / statistics.median(columnar):8.2f}x")
@@ -0,0 +1,176 @@
+import json  # Used to build the Dash callback requests and to save the results.
+import os  # Used to point the app at the stub server and to read the load-test settings.
+import sys  # Used to fail the run when the latency budget is exceeded.
+import tempfile  # The history store of a load test lives in a throw-away directory.
+import threading  # Each worker thread keeps its own HTTP session.
+import time  # Used to time every simulated click.
+from concurrent.futures import ThreadPoolExecutor  # Runs the simulated users side by side.
+
+import requests  # Sends the Dash callback requests, like a browser would.
+from werkzeug.serving import WSGIRequestHandler, make_server  # Serves the Dash app from a background thread.
+
+from benchmarks.stub_server import ROUTES, start_stub_server  # Local replay of the OpenWeatherMap APIs.
+
+# --- Task: Starting the stub server before the app reads its settings ---
+
+# Simulated round-trip time per endpoint (min, max) in seconds; the history API is deliberately the slowest.
+LATENCY = {
+    "/geo/1.0/direct": (0.03, 0.08),
+    "/data/2.5/weather": (0.05, 0.12),
+    "/data/2.5/forecast": (0.08, 0.18),
+    "/data/2.5/history/city": (0.20, 0.45),
+}
+
+latency_scale = float(os.getenv("BENCH_LATENCY_SCALE", "1"))  # 0 removes the simulated network entirely.
+error_rate = float(os.getenv("BENCH_ERROR_RATE", "0"))  # Fraction of API requests answered with HTTP 500.
+server = start_stub_server({path: (low * latency_scale, high * latency_scale) for path, (low, high) in LATENCY.items()},
+                           {path: error_rate for path in ROUTES}, seed=1)
+base_url = f"http://{server.server_address[0]}:{server.server_address[1]}"  # Address of the stub server.
+os.environ["WEATHER_API_BASE_URL"] = base_url  # Sends geocoding, current and forecast requests to the stub.
+os.environ["WEATHER_HISTORY_BASE_URL"] = base_url  # Sends history requests to the stub.
+os.environ["WEATHER_API_KEY"] = "benchmark"  # The stub server does not check the API key.
+os.environ["WEATHER_HISTORY_STORE_DIR"] = tempfile.mkdtemp(prefix="weather-load-test-")  # Starts from an empty history store.
+os.environ["WEATHER_PREFETCH"] = "0"  # Background refreshes would add API calls the load test does not control.
+os.environ.setdefault("WEATHER_METRICS", "1")  # Serves '/metrics' so it can be scraped during the run.
+
+import app as dashboard  # noqa: E402
+from weather import metrics  # noqa: E402
+from weather.cache import configure_cache, get_cache  # noqa: E402
+from weather.http_client import get_client  # noqa: E402
+
+CITIES = [city.strip() for city in os.getenv("BENCH_CITIES", "London,Paris,Berlin,Madrid,Rome,Vienna,Oslo,Dublin").split(",")]
+HISTORY_DAYS = int(os.getenv("BENCH_HISTORY_DAYS", "30"))  # History range requested by every click.
+GRAPH_WIDTH = 1200  # Browser window width reported by the simulated users.
+
+
+# --- Task: Simulating one click on 'Submit' ---
+
+def click_function(city):  # Calls the data callbacks directly, without Dash or HTTP in between.
+    return (dashboard.update_weather_dashboard(1, city) is not None
+            and dashboard.update_history_data(1, city, HISTORY_DAYS) is not None)
+
+
+_sessions = threading.local()  # One keep-alive session per simulated user.
+
+
+def _dash_callback(url, outputs, inputs, state=()):  # Sends one callback request and returns the new value of its (first) output.
+    session = getattr(_sessions, "session", None)
+    if session is None:
+        session = _sessions.session = requests.Session()
+    outputs = [outputs] if isinstance(outputs, str) else outputs
+    specs = [{"id": name.split(".")[0], "property": name.split(".")[1]} for name in outputs]
+    body = {
+        "output": outputs[0] if len(outputs) == 1 else ".." + "...".join(outputs) + "..",  # Dash's encoding of multiple outputs.
+        "outputs": specs[0] if len(specs) == 1 else specs,
+        "inputs": [{"id": name.split(".")[0], "property": name.split(".")[1], "value": value} for name, value in inputs],
+        "state": [{"id": name.split(".")[0], "property": name.split(".")[1], "value": value} for name, value in state],
+        "changedPropIds": [inputs[0][0]],
+    }
+    response = session.post(f"{url}/_dash-update-component", data=json.dumps(body), headers={"Content-Type": "application/json"})
+    if response.status_code == 204:  # The callback chose not to update its output.
+        return None
+    response.raise_for_status()
+    return response.json()["response"][specs[0]["id"]][specs[0]["property"]]
+
+
+def click_http(url, city):  # Sends the same callback requests a browser sends after 'Submit': the data first, then every panel.
+    weather_data = _dash_callback(url, "weather-data.data", [("submit-button.n_clicks", 1)], [("city-input.value", city)])
+    history_data = _dash_callback(url, "history-data.data", [("submit-button.n_clicks", 1)],
+                                  [("city-input.value", city), ("history-range-dropdown.value", HISTORY_DAYS)])
+    if weather_data is None or history_data is None:
+        return False
+    panel_inputs = [("weather-data.data", weather_data), ("unit-dropdown.value", "metric")]
+    _dash_callback(url, "current-weather-output.children", panel_inputs)
+    _dash_callback(url, "forecast-graph.figure", panel_inputs)
+    _dash_callback(url, ["historical-weather-graph.figure", "history-zoom.data"],
+                   [("history-data.data", history_data), ("unit-dropdown.value", "metric"),
+                    ("history-resolution-dropdown.value", "auto"), ("historical-weather-graph.relayoutData", None)],
+                   [("graph-width.data", GRAPH_WIDTH), ("history-zoom.data", None)])
+    return True
+
+
+class QuietRequestHandler(WSGIRequestHandler):  # Silences the per-request log lines so the report stays readable.
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+# --- Task: Running clicks at a fixed concurrency ---
+
+def percentile(values, q):  # The value below which a fraction 'q' of the measurements fall.
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def run(mode, click, total, concurrency):  # Runs 'total' clicks with 'concurrency' simulated users and summarises them.
+    metrics.reset()  # Stage histograms cover this run only.
+
+    def one(index):
+        city = CITIES[index % len(CITIES)]
+        started = time.perf_counter()
+        try:
+            ok = click(city)
+        except Exception as exc:
+            print(f"Click for {city} failed: {exc}")
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load-test") as executor:
+        results = list(executor.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = [seconds * 1000 for seconds, _ in results]
+    return {
+        "mode": mode, "clicks": total, "concurrency": concurrency,
+        "failures": sum(1 for _, ok in results if not ok),
+        "clicks_per_second": round(total / elapsed, 2),
+        "latency_ms": {"p50": round(percentile(latencies, 0.50), 1), "p95": round(percentile(latencies, 0.95), 1),
+                       "p99": round(percentile(latencies, 0.99), 1), "max": round(max(latencies), 1)},
+        "stages": metrics.stage_summary(),
+    }
+
+
+def report(result):  # Prints the throughput, click latency and per-stage times of one run.
+    latency = result["latency_ms"]
+    print(f"\n{result['mode']}: {result['clicks']} clicks, {result['concurrency']} users, {result['clicks_per_second']} clicks/s, "
+          f"{result['failures']} failed")
+    print(f"  click latency   p50 {latency['p50']:8.1f} ms   p95 {latency['p95']:8.1f} ms   p99 {latency['p99']:8.1f} ms   max {latency['max']:8.1f} ms")
+    for stage, summary in result["stages"].items():
+        if summary["count"]:
+            print(f"  {stage:<15} p50 {summary['p50_ms']:8.1f} ms   p95 {summary['p95_ms']:8.1f} ms   "
+                  f"mean {summary['mean_ms']:8.1f} ms   ({summary['count']} runs)")
+
+
+if __name__ == '__main__':
+    total = int(os.getenv("BENCH_CLICKS", "200"))  # Clicks per mode.
+    concurrency = int(os.getenv("BENCH_CONCURRENCY", "8"))  # Simulated users clicking at the same time.
+    modes = os.getenv("BENCH_MODES", "function,http").split(",")  # 'function' calls the callback directly, 'http' goes through Dash.
+    max_p95 = float(os.getenv("BENCH_MAX_P95_MS", "0"))  # Fails the run if any mode is slower than this (0 = no limit).
+    if os.getenv("BENCH_CACHE", "1") == "0":  # Every click goes to the stub server (history still comes from the local store).
+        configure_cache(ttls={"geocode": 0, "current": 0, "forecast": 0, "history": 0})
+
+    print(f"Stub API at {base_url}: latency x{latency_scale}, error rate {error_rate}; cities: {', '.join(CITIES)}")
+    for city in CITIES:  # Fills the cache and the history store first, so every mode measures the same warm state.
+        click_function(city)
+
+    app_server = make_server("127.0.0.1", 0, dashboard.app.server, threaded=True, request_handler=QuietRequestHandler)  # The Flask server behind Dash, on a free port.
+    threading.Thread(target=app_server.serve_forever, daemon=True).start()
+    app_url = f"http://127.0.0.1:{app_server.server_port}"
+
+    results = []
+    for mode in modes:
+        click = click_function if mode == "function" else (lambda city: click_http(app_url, city))
+        results.append(run(mode, click, total, concurrency))
+        report(results[-1])
+
+    print(f"\nStub server  {server.stats()}")
+    print(f"Cache        {get_cache().stats()}")
+    print(f"HTTP client  {get_client().stats()}")
+    if os.getenv("BENCH_OUTPUT"):  # Saves the results so later runs can be compared against them.
+        with open(os.environ["BENCH_OUTPUT"], "w") as output_file:
+            json.dump(results, output_file, indent=2)
+
+    slow = [result["mode"] for result in results if max_p95 and result["latency_ms"]["p95"] > max_p95]
+    if slow:
+        print(f"p95 click latency above {max_p95} ms in: {', '.join(slow)}")
+        sys.exit(1)
@@ -0,0 +1,30 @@
+import json  # Used to save the recorded responses.
+import os  # Used to read the API key and the city to record.
+import time  # Used to pick the last week of history.
+
+from benchmarks.stub_server import FIXTURES_DIR  # Directory the stub server replays the responses from.
+from weather import config  # API base URLs.
+from weather.http_client import get_client  # Shared HTTP client used by the fetchers.
+
+
+# --- Task: Recording real OpenWeatherMap responses for the stub server ---
+
+def record(name, url, params):  # Calls one API and saves its raw JSON response as '<name>.json'.
+    response = get_client().get(url, params=params, timeout=config.REQUEST_TIMEOUT)
+    response.raise_for_status()  # Never overwrites a fixture with an error response.
+    with open(os.path.join(FIXTURES_DIR, f"{name}.json"), "w") as fixture_file:
+        json.dump(response.json(), fixture_file, indent=1)
+    print(f"Recorded {name}.json")
+    return response.json()
+
+
+if __name__ == '__main__':  # Needs a real API key with access to the history API.
+    api_key = os.environ["WEATHER_API_KEY"]
+    city = os.getenv("RECORD_CITY", "London")
+    coordinates = record("geocode", f"{config.API_BASE_URL}/geo/1.0/direct", {"q": city, "limit": 1, "appid": api_key})[0]
+    location = {"lat": coordinates["lat"], "lon": coordinates["lon"], "appid": api_key, "units": "metric"}  # The dashboard always fetches metric data.
+    record("current", f"{config.API_BASE_URL}/data/2.5/weather", location)
+    record("forecast", f"{config.API_BASE_URL}/data/2.5/forecast", location)
+    end = int(time.time()) // 3600 * 3600
+    record("history", f"{config.HISTORY_BASE_URL}/data/2.5/history/city",
+           dict(location, type="hour", start=end - 7 * 24 * 3600, end=end))  # One week, the most a single request returns.
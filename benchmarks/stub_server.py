@@ -0,0 +1,169 @@
+import copy  # Used to hand out copies of the recorded payloads, so replays never modify them.
+import json  # Used to read the recorded payloads and encode the responses.
+import os  # Used to locate the recorded payloads and read the settings of a standalone server.
+import random  # Used to vary the latency and to decide which requests fail.
+import threading  # Used to run the stub server in the background while a benchmark runs.
+import time  # Used to simulate network latency and to move the recorded timestamps to the present.
+import zlib  # Used to give every city name its own stable coordinates.
+from collections import Counter  # Counts the requests and injected errors per path.
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Standard-library HTTP server that handles requests in parallel.
+from urllib.parse import urlparse, parse_qs  # Used to read the path and query parameters of incoming requests.
+
+# Directory holding the recorded responses (see 'benchmarks/record_fixtures.py').
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+# --- Task: Loading the recorded OpenWeatherMap payloads ---
+
+def load_fixture(name, fixtures_dir=None):  # Reads one recorded response ('geocode', 'current', 'forecast' or 'history').
+    with open(os.path.join(fixtures_dir or FIXTURES_DIR, f"{name}.json")) as fixture_file:
+        return json.load(fixture_file)
+
+
+# The recorded responses, read once when the module is imported.
+FIXTURES = {name: load_fixture(name) for name in ("geocode", "current", "forecast", "history")}
+
+
+# --- Task: Replaying the payloads for any city and time range ---
+
+def _coordinates(params):  # The location a request asked for, falling back to the recorded one.
+    lat = float(params["lat"][0]) if "lat" in params else FIXTURES["current"]["coord"]["lat"]
+    lon = float(params["lon"][0]) if "lon" in params else FIXTURES["current"]["coord"]["lon"]
+    return lat, lon
+
+
+def geocode_payload(params):  # Replays the Geocoding API; other cities get stable coordinates of their own.
+    payload = copy.deepcopy(FIXTURES["geocode"])
+    city = params.get("q", [payload[0]["name"]])[0].split(",")[0].strip()
+    if city.lower() != payload[0]["name"].lower():  # Spreads other cities over the globe so each has its own cache entries and store.
+        seed = zlib.crc32(city.lower().encode("utf-8"))
+        payload[0].update(name=city.title(), lat=round((seed % 12000) / 100 - 60, 4), lon=round((seed // 12000 % 36000) / 100 - 180, 4))
+        for field in ("local_names", "state"):  # Fields that only describe the recorded city.
+            payload[0].pop(field, None)
+    return payload
+
+
+def current_payload(params):  # Replays the current weather API as an observation made just now.
+    payload = copy.deepcopy(FIXTURES["current"])
+    shift = int(time.time()) - payload["dt"]  # Moves the recorded observation to the present.
+    payload["dt"] += shift
+    payload["sys"]["sunrise"] += shift // 86400 * 86400  # Whole days only, so sunrise and sunset keep their time of day.
+    payload["sys"]["sunset"] += shift // 86400 * 86400
+    payload["coord"]["lat"], payload["coord"]["lon"] = _coordinates(params)
+    return payload
+
+
+def forecast_payload(params):  # Replays the 5-day forecast API starting from the current 3-hour slot.
+    payload = copy.deepcopy(FIXTURES["forecast"])
+    first = payload["list"][0]["dt"]
+    shift = (int(time.time()) // 10800 + 1) * 10800 - first  # Moves the first entry to the next 3-hour slot.
+    for entry in payload["list"]:
+        entry["dt"] += shift
+        entry["dt_txt"] = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(entry["dt"]))
+    payload["city"]["coord"]["lat"], payload["city"]["coord"]["lon"] = _coordinates(params)
+    return payload
+
+
+def history_payload(params):  # Replays the historical weather API: the recorded hours are repeated over the requested range.
+    recorded = FIXTURES["history"]["list"]
+    start = int(params.get("start", [0])[0]) // 3600 * 3600  # The first hour of the requested range.
+    end = int(params.get("end", [0])[0])  # The end of the requested range.
+    first = recorded[0]["dt"] // 3600 * 3600
+    entries = [dict(recorded[(dt - first) // 3600 % len(recorded)], dt=dt) for dt in range(start, end, 3600)]  # Same hour of the recording, new timestamp.
+    return dict(FIXTURES["history"], list=entries, cnt=len(entries), message=f"Count: {len(entries)}")
+
+
+# Maps each API path to the function building its payload.
+ROUTES = {
+    "/geo/1.0/direct": geocode_payload,
+    "/data/2.5/weather": current_payload,
+    "/data/2.5/forecast": forecast_payload,
+    "/data/2.5/history/city": history_payload,
+}
+
+
+# --- Task: Serving the payloads with configurable latency and errors ---
+
+class StubServer(ThreadingHTTPServer):  # HTTP server holding the latency and error settings of one stub instance.
+    daemon_threads = True  # Request threads do not keep the process alive.
+
+    def __init__(self, address, latency=None, errors=None, seed=None):
+        super().__init__(address, StubHandler)
+        self.latency = latency or {}  # Delay per path: seconds, or a (min, max) range in seconds.
+        self.errors = errors or {}  # Failure rate per path: a fraction, or a (fraction, status code) pair.
+        self.random = random.Random(seed)  # Seeded, so a benchmark injects the same errors every run.
+        self.random_lock = threading.Lock()  # 'random.Random' is not safe to share between request threads.
+        self.requests = Counter()  # Requests answered per path.
+        self.injected_errors = Counter()  # Errors injected per path.
+
+    def delay_for(self, path):  # Seconds to wait before answering a request for 'path'.
+        latency = self.latency.get(path, 0.0)
+        if isinstance(latency, (tuple, list)):  # A range: every request gets a random delay inside it.
+            with self.random_lock:
+                return self.random.uniform(*latency)
+        return latency
+
+    def error_for(self, path):  # Status code to fail a request for 'path' with, or None to answer it normally.
+        error = self.errors.get(path)
+        if not error:
+            return None
+        rate, status = error if isinstance(error, (tuple, list)) else (error, 500)
+        with self.random_lock:
+            return status if self.random.random() < rate else None
+
+    def stats(self):  # Requests answered and errors injected per path.
+        return {"requests": dict(self.requests), "injected_errors": dict(self.injected_errors)}
+
+
+class StubHandler(BaseHTTPRequestHandler):  # Answers every request with the matching replayed payload after a delay.
+    protocol_version = "HTTP/1.1"  # Keeps connections open between requests, like the real API.
+
+    def do_GET(self):  # Handles an HTTP GET request.
+        url = urlparse(self.path)  # Splits the request into path and query string.
+        route = ROUTES.get(url.path)  # Looks up the payload builder for this path.
+        if route is None:  # Unknown paths are answered with 404 like the real API.
+            self.send_error(404)
+            return
+
+        time.sleep(self.server.delay_for(url.path))  # Simulates the round trip to the real API.
+        self.server.requests[url.path] += 1
+        status = self.server.error_for(url.path)
+        if status is not None:  # Fails this request on purpose.
+            self.server.injected_errors[url.path] += 1
+            self._send_json(status, {"cod": status, "message": "injected error"})
+            return
+        self._send_json(200, route(parse_qs(url.query)))
+
+    def _send_json(self, status, payload):  # Sends a JSON response that keeps the connection open.
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # Silences the per-request log lines so benchmark output stays readable.
+        pass
+
+
+def start_stub_server(latency=None, errors=None, host="127.0.0.1", port=0, seed=None):  # Starts the stub server in a background thread and returns it.
+    # latency: e.g. {"/data/2.5/history/city": 0.5} or {"/data/2.5/weather": (0.05, 0.2)}.
+    # errors: e.g. {"/data/2.5/forecast": 0.05} (HTTP 500) or {"/data/2.5/weather": (0.1, 429)}.
+    server = StubServer((host, port), latency, errors, seed)  # Port 0 lets the operating system pick a free port.
+    threading.Thread(target=server.serve_forever, daemon=True).start()  # Serves requests until the process exits.
+    return server  # The caller reads 'server.server_address' to find the port.
+
+
+# --- Task: Running the stub server on its own ---
+
+if __name__ == '__main__':  # Serves the replayed API so the dashboard itself can be pointed at it.
+    latency = float(os.getenv("STUB_LATENCY", "0.1"))  # Delay of every request in seconds.
+    error_rate = float(os.getenv("STUB_ERROR_RATE", "0"))  # Fraction of requests answered with HTTP 500.
+    server = start_stub_server({path: latency for path in ROUTES}, {path: error_rate for path in ROUTES},
+                               port=int(os.getenv("STUB_PORT", "8081")))
+    print(f"Stub OpenWeatherMap API on http://{server.server_address[0]}:{server.server_address[1]} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
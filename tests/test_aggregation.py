@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+
+from weather.aggregation import aggregate_for_display, downsample, lttb_indices
+
+
+def test_lttb_keeps_the_endpoints_and_returns_the_target_count():
+    x = np.arange(10_000)
+    y = np.sin(x / 200.0)
+    for target in (3, 10, 500, 9_999):
+        indices = lttb_indices(x, y, target)
+        assert len(indices) == target
+        assert indices[0] == 0 and indices[-1] == len(x) - 1
+        assert np.all(np.diff(indices) > 0)  # One point per bucket, in order.
+
+
+def test_lttb_keeps_a_spike():
+    y = np.zeros(1_000)
+    y[437] = 50.0
+    assert 437 in lttb_indices(np.arange(1_000), y, 20)
+
+
+def test_lttb_leaves_short_series_alone():
+    assert lttb_indices(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_downsample_and_bands_fit_the_target():
+    df = pd.DataFrame({"datetime": pd.date_range("2024-01-01", periods=24 * 365, freq="h", tz="UTC")})
+    df["temp"] = np.sin(np.arange(len(df)) / 24.0) * 10
+    df["temp_min"], df["temp_max"] = df["temp"] - 2, df["temp"] + 2
+
+    thinned = downsample(df, 800)
+    assert len(thinned) == 800
+    assert thinned["datetime"].iloc[0] == df["datetime"].iloc[0] and thinned["datetime"].iloc[-1] == df["datetime"].iloc[-1]
+
+    bands, resolution = aggregate_for_display(df, 800)
+    assert resolution == "daily" and len(bands) <= 800
@@ -0,0 +1,55 @@
+import threading
+import time
+
+from weather.cache import MemoryBackend, ResponseCache, SQLiteBackend
+
+
+def test_concurrent_misses_share_one_fetch():
+    cache = ResponseCache(MemoryBackend())
+    release = threading.Event()
+    calls = []
+
+    def fetch():  # Blocks until every caller is waiting, so they all miss at the same time.
+        calls.append(1)
+        release.wait(5)
+        return {"temp": 12.5}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch("current", "key", fetch))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 7 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert results == [{"temp": 12.5}] * 8
+    assert cache.stats()["misses"] == 1 and cache.stats()["coalesced"] == 7
+
+
+def test_failed_fetch_is_not_cached():
+    cache = ResponseCache(MemoryBackend())
+    assert cache.get_or_fetch("current", "key", lambda: None) is None
+    assert cache.get_or_fetch("current", "key", lambda: {"temp": 1}) == {"temp": 1}
+
+
+def test_entries_expire_after_their_ttl():
+    cache = ResponseCache(MemoryBackend(), ttls={"current": 0.05})
+    assert cache.get_or_fetch("current", "key", lambda: 1) == 1
+    assert cache.get_or_fetch("current", "key", lambda: 2) == 1  # Still fresh.
+    time.sleep(0.1)
+    assert cache.get_or_fetch("current", "key", lambda: 3) == 3  # Expired, so fetched again.
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_sqlite_hits_do_not_write(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / "cache.db"))
+    backend.set("key", {"temp": 1}, 60)
+    connection = backend._connection()
+    changes = connection.total_changes
+    for _ in range(100):
+        assert backend.get("key")[0] == {"temp": 1}
+    assert connection.total_changes == changes
@@ -0,0 +1,53 @@
+from weather import historical_weather
+from weather.historical_weather import backfill_with_failures, split_time_range
+
+WEEK = 7 * 24 * 3600
+
+
+def history_payload(start, end):  # A history API response with one entry per hour of [start, end).
+    entries = [{"dt": dt, "main": {"temp": 10.0, "feels_like": 9.0, "temp_min": 8.0, "temp_max": 12.0, "humidity": 70, "pressure": 1012}}
+               for dt in range(start - start % 3600, end, 3600)]
+    return {"list": entries, "cnt": len(entries)}
+
+
+def test_windows_are_aligned_to_the_grid():
+    start, end = 1_000_000, 1_000_000 + 3 * WEEK
+    windows = split_time_range(start, end, WEEK)
+
+    assert windows[0][0] == start and windows[-1][1] == end  # The first and last window are clipped to the range.
+    assert all(window_start % WEEK == 0 for window_start, _ in windows[1:])
+    assert all(previous[1] == window[0] for previous, window in zip(windows, windows[1:]))  # No gaps or overlaps.
+    assert len(windows) == 4  # An unaligned range touches one more window than its length suggests.
+
+
+def test_windows_do_not_depend_on_the_exact_start():
+    later = split_time_range(1_000_000 + 3600, 1_000_000 + 3 * WEEK, WEEK)
+    assert later[1:] == split_time_range(1_000_000, 1_000_000 + 3 * WEEK, WEEK)[1:]  # Shifting the start reuses the same cached windows.
+
+
+def test_short_range_is_one_window():
+    assert split_time_range(3600, 7200, WEEK) == [(3600, 7200)]
+
+
+def test_backfill_reports_the_windows_that_failed(monkeypatch):
+    start = WEEK * 100
+    end = start + 3 * WEEK
+    failing = (start + WEEK, start + 2 * WEEK)
+
+    def fake_history(lat, lon, window_start, window_end, api_key, units="metric", timeout=None):
+        return None if (window_start, window_end) == failing else history_payload(window_start, window_end)
+
+    monkeypatch.setattr(historical_weather.config, "HISTORY_WINDOW_HOURS", 168)
+    monkeypatch.setattr(historical_weather, "get_historical_weather", fake_history)
+    df, failed_windows = backfill_with_failures(51.5, -0.12, start, end, "key")
+
+    assert failed_windows == [failing]
+    assert len(df) == 2 * WEEK // 3600  # The hours of the two windows that arrived are kept.
+    assert df['datetime'].is_monotonic_increasing and df['datetime'].is_unique
+
+
+def test_backfill_with_every_window_failing_returns_an_empty_frame(monkeypatch):
+    monkeypatch.setattr(historical_weather, "get_historical_weather", lambda *args, **kwargs: None)
+    df, failed_windows = backfill_with_failures(51.5, -0.12, 0, 3600 * 48, "key")
+    assert df.empty and 'temp' in df.columns
+    assert failed_windows == split_time_range(0, 3600 * 48)
@@ -0,0 +1,63 @@
+import pandas as pd
+
+from weather.history_store import HistoryStore
+from weather.processing import entries_to_frame
+
+HOUR = 3600
+LAT, LON = 51.5073, -0.1276
+
+
+def hours(start, end, temp=10.0):  # A history DataFrame with one row per hour of [start, end).
+    return entries_to_frame([{"dt": dt, "main": {"temp": temp, "feels_like": temp, "temp_min": temp - 1, "temp_max": temp + 1,
+                                                 "humidity": 70, "pressure": 1012}, "wind": {"speed": 3.5}}
+                             for dt in range(start, end, HOUR)])
+
+
+def test_write_then_read_range_round_trips(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    df = hours(0, 48 * HOUR)
+    store.write(LAT, LON, "metric", df, 0, 48 * HOUR)
+
+    stored = store.read_range(LAT, LON, "metric", 0, 48 * HOUR)
+    pd.testing.assert_frame_equal(stored, df[stored.columns])
+    assert len(store.read_range(LAT, LON, "metric", 10 * HOUR, 20 * HOUR)) == 11  # Both ends are inclusive.
+    assert store.read_range(LAT, LON, "imperial", 0, 48 * HOUR).empty  # Each unit system is stored separately.
+
+
+def test_rewritten_hours_replace_the_stored_ones(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.write(LAT, LON, "metric", hours(0, 10 * HOUR, temp=10.0))
+    store.write(LAT, LON, "metric", hours(5 * HOUR, 15 * HOUR, temp=20.0))
+
+    stored = store.read_range(LAT, LON, "metric", 0, 15 * HOUR)
+    assert len(stored) == 15 and stored['datetime'].is_unique
+    assert stored['temp'].tolist() == [10.0] * 5 + [20.0] * 10
+
+
+def test_missing_ranges_of_an_empty_store(tmp_path):
+    assert HistoryStore(str(tmp_path)).missing_ranges(LAT, LON, "metric", 0, 10 * HOUR) == [(0, 10 * HOUR)]
+
+
+def test_overlapping_writes_merge_their_covered_ranges(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.write(LAT, LON, "metric", hours(10 * HOUR, 20 * HOUR), 10 * HOUR, 20 * HOUR)
+    store.write(LAT, LON, "metric", hours(15 * HOUR, 30 * HOUR), 15 * HOUR, 30 * HOUR)
+
+    assert store.missing_ranges(LAT, LON, "metric", 12 * HOUR, 28 * HOUR) == []
+    assert store.missing_ranges(LAT, LON, "metric", 0, 40 * HOUR) == [(0, 10 * HOUR), (30 * HOUR, 40 * HOUR)]
+    assert store.missing_ranges(LAT, LON, "metric", 25 * HOUR, 40 * HOUR) == [(30 * HOUR, 40 * HOUR)]
+
+
+def test_disjoint_write_does_not_hide_the_gap(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.write(LAT, LON, "metric", hours(0, 10 * HOUR), 0, 10 * HOUR)
+    store.write(LAT, LON, "metric", hours(20 * HOUR, 30 * HOUR), 20 * HOUR, 30 * HOUR)
+
+    assert store.missing_ranges(LAT, LON, "metric", 0, 30 * HOUR) == [(10 * HOUR, 30 * HOUR)]
+
+
+def test_write_without_a_covered_range_keeps_the_range_open(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.write(LAT, LON, "metric", hours(0, 10 * HOUR))  # E.g. a backfill with failed windows.
+    assert store.missing_ranges(LAT, LON, "metric", 0, 10 * HOUR) == [(0, 10 * HOUR)]
+    assert len(store.read_range(LAT, LON, "metric", 0, 10 * HOUR)) == 10
@@ -0,0 +1,26 @@
+import time
+
+from weather.rate_limit import RateLimiter
+
+
+def test_acquire_enforces_the_rate():
+    limiter = RateLimiter(50, burst=1)  # One call every 20 ms, no bursts.
+    started = time.monotonic()
+    for _ in range(11):
+        limiter.acquire()
+    assert time.monotonic() - started >= 10 / 50 * 0.9  # The first call is free, the next ten wait for a token each.
+    assert limiter.stats()["acquired"] == 11
+
+
+def test_try_acquire_allows_a_burst_then_refuses():
+    limiter = RateLimiter(1, per=60.0, burst=3)
+    assert [limiter.try_acquire() for _ in range(4)] == [True, True, True, False]
+    assert limiter.stats()["acquired"] == 3
+
+
+def test_tokens_refill_over_time():
+    limiter = RateLimiter(100, burst=1)
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    time.sleep(0.03)
+    assert limiter.try_acquire()
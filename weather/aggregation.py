@@ -0,0 +1,78 @@
+import numpy as np  # 'numpy' is used for the downsampling arithmetic.
+import pandas as pd  # 'pandas' is used to resample the time series.
+
+# Bucket sizes offered for min/mean/max bands, as pandas resampling rules.
+RESOLUTIONS = {
+    "hourly": "1h",
+    "daily": "1D",
+    "weekly": "7D",
+}
+
+
+# --- Task: Resampling a time series into min/mean/max bands ---
+
+def resample_bands(df, resolution):  # Summarises the temperature of each hour, day or week as its minimum, mean and maximum.
+    rule = RESOLUTIONS[resolution]  # The pandas resampling rule for the chosen bucket size.
+    resampled = df.set_index('datetime').resample(rule)  # Groups the rows into fixed-size time buckets.
+    bands = pd.DataFrame({
+        'temp_min': resampled['temp_min'].min(),  # Lowest temperature in each bucket.
+        'temp': resampled['temp'].mean(),  # Average temperature in each bucket.
+        'temp_max': resampled['temp_max'].max(),  # Highest temperature in each bucket.
+    })
+    return bands.dropna().reset_index()  # Drops empty buckets (gaps in the data) and returns 'datetime' as a column.
+
+
+def choose_resolution(df, target_points):  # Picks the finest bucket size that still fits in the target number of points.
+    if df.empty:
+        return "hourly"
+    span = df['datetime'].iloc[-1] - df['datetime'].iloc[0]  # Time covered by the data.
+    for resolution, rule in RESOLUTIONS.items():  # Tries hourly, then daily, then weekly buckets.
+        if span / pd.Timedelta(rule) <= target_points:
+            return resolution
+    return "weekly"  # Even weekly buckets are too many; they will be downsampled further.
+
+
+# --- Task: Largest-Triangle-Three-Buckets (LTTB) downsampling ---
+
+def lttb_indices(x, y, target_points):  # Returns the indices of the points that best preserve the shape of the line.
+    count = len(x)
+    if target_points >= count or target_points < 3:  # Nothing to remove.
+        return np.arange(count)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, count - 1, target_points - 1).astype(np.int64)  # Bucket boundaries; the first and last points are always kept.
+    selected = np.empty(target_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, count - 1
+    previous = 0  # Index of the point kept in the previous bucket.
+
+    for bucket in range(target_points - 2):  # Keeps one point per bucket.
+        start, end = edges[bucket], edges[bucket + 1]  # Points of the current bucket.
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else count  # Points of the next bucket.
+        next_x = x[end:next_end].mean()  # The next bucket is represented by its average point.
+        next_y = y[end:next_end].mean()
+        # Keeps the point forming the largest triangle with the previously kept point and the next bucket's average.
+        areas = np.abs((x[previous] - next_x) * (y[start:end] - y[previous]) - (x[previous] - x[start:end]) * (next_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def downsample(df, target_points, column='temp'):  # Reduces a DataFrame to at most 'target_points' rows using LTTB on one column.
+    if len(df) <= target_points:
+        return df
+    timestamps = df['datetime'].dt.tz_localize(None) if df['datetime'].dt.tz is not None else df['datetime']  # Drops the time zone so numpy can convert the values.
+    x = timestamps.to_numpy(dtype='datetime64[s]').astype(np.int64)  # Timestamps as Unix seconds.
+    return df.iloc[lttb_indices(x, df[column].to_numpy(), target_points)].reset_index(drop=True)
+
+
+# --- Task: Preparing a time series for display ---
+
+def aggregate_for_display(df, target_points, resolution="auto"):  # Returns (DataFrame, resolution) small enough to plot.
+    if resolution == "raw":  # Full-resolution line, thinned out to the target number of points.
+        return downsample(df, target_points), "raw"
+    if resolution == "auto":
+        resolution = choose_resolution(df, target_points)
+    bands = resample_bands(df, resolution)  # Min/mean/max per bucket.
+    return downsample(bands, target_points), resolution  # Thins out the bands if there are still too many buckets.
@@ -0,0 +1,112 @@
+import csv  # Used to read uploaded lists of locations.
+import io  # Used to read CSV text as a file.
+from concurrent.futures import ThreadPoolExecutor  # Bounded worker pool used to fetch many locations concurrently.
+from datetime import datetime, timezone, timedelta  # Used to build the history range of each location.
+
+import pandas as pd  # Used to combine the per-location DataFrames into one long-format DataFrame.
+
+from weather import config  # Shared settings (worker count).
+from weather.current_weather import get_city_coordinates, get_weather_by_coordinates  # Geocoding and current weather fetchers.
+from weather.forecast import get_forecast_by_coordinates, process_forecast_data  # Forecast fetcher and processing.
+from weather.history_store import load_historical_weather  # History, read from the local store where possible.
+from weather.processing import entries_to_frame  # Converts API entries into a typed DataFrame.
+
+
+# --- Task: Reading lists of locations ---
+
+def parse_city_list(text):  # Splits free text ("London, Paris\nBerlin") into a list of unique city names.
+    cities = []  # Initializes an empty list to store the city names in the order they were given.
+    for line in (text or "").splitlines():  # Cities may be separated by new lines...
+        for city in line.split(","):  # ...or by commas.
+            city = city.strip()
+            if city and city.lower() not in (known.lower() for known in cities):  # Skips blanks and duplicates.
+                cities.append(city)
+    return cities
+
+
+def parse_locations_csv(text):  # Reads a CSV with 'lat' and 'lon' columns (and an optional 'name' or 'city' column).
+    locations = []  # Initializes an empty list to store the locations.
+    for row_number, row in enumerate(csv.DictReader(io.StringIO(text)), start=2):  # Row 1 is the header.
+        row = {key.strip().lower(): (value or "").strip() for key, value in row.items() if key}
+        try:
+            lat, lon = float(row['lat']), float(row['lon'])
+        except (KeyError, ValueError):  # Rows without valid coordinates are skipped.
+            print(f"Skipping CSV row {row_number}: 'lat' and 'lon' must be numbers")
+            continue
+        name = row.get('name') or row.get('city') or f"{lat:.4f}, {lon:.4f}"  # Falls back to the coordinates as a label.
+        locations.append({'name': name, 'lat': lat, 'lon': lon})
+    return locations
+
+
+# --- Task: Calling the fetchers under an optional extra rate limit ---
+
+def _fetch(fetcher, rate_limiter, *args, **kwargs):  # Calls a cached fetcher; the global API limit is enforced by the HTTP client itself.
+    if rate_limiter is not None and fetcher.expires_in(*args, **kwargs) is None:  # A caller's own limiter is only used up by requests that reach the API.
+        rate_limiter.acquire()
+    return fetcher(*args, **kwargs)
+
+
+def _geocode(city, api_key, rate_limiter):  # Looks up one city; network errors only leave that city out.
+    try:
+        return _fetch(get_city_coordinates, rate_limiter, city, api_key)
+    except Exception as exc:
+        print(f"Error fetching geocoding data for {city}: {exc}")
+        return None
+
+
+def geocode_cities(cities, api_key, max_workers=None, rate_limiter=None):  # Looks up the coordinates of many cities concurrently.
+    with ThreadPoolExecutor(max_workers=max_workers or config.BATCH_MAX_WORKERS, thread_name_prefix="weather-geocode") as executor:
+        results = list(executor.map(lambda city: _geocode(city, api_key, rate_limiter), cities))  # Keeps the input order.
+
+    locations = []  # Initializes an empty list to store the cities that were found.
+    for city, coordinates in zip(cities, results):
+        if coordinates:  # Cities that could not be found are skipped (the fetcher already printed why).
+            locations.append({'name': city, 'lat': coordinates['lat'], 'lon': coordinates['lon']})
+    return locations
+
+
+# --- Task: Fetching weather data for many locations at once ---
+
+def _fetch_location(location, api_key, kinds, units, history_days, rate_limiter):  # Fetches every requested kind of data for one location.
+    lat, lon = location['lat'], location['lon']
+    frames = []  # Initializes an empty list to store one DataFrame per kind of data.
+
+    if "current" in kinds:
+        weather_data = _fetch(get_weather_by_coordinates, rate_limiter, lat, lon, api_key, units=units)
+        if weather_data:
+            frames.append(entries_to_frame([weather_data]).assign(kind="current"))  # The current payload has the same layout as a forecast entry.
+
+    if "forecast" in kinds:
+        forecast_data = _fetch(get_forecast_by_coordinates, rate_limiter, lat, lon, api_key, units=units)
+        if forecast_data:
+            frames.append(process_forecast_data(forecast_data).assign(kind="forecast"))
+
+    if "history" in kinds:  # Windows missing from the local store are fetched by the backfill.
+        now = datetime.now(tz=timezone.utc).replace(minute=0, second=0, microsecond=0)  # Aligned to the hour so repeated batches reuse cached windows.
+        start, end = int((now - timedelta(days=history_days)).timestamp()), int(now.timestamp())
+        frames.append(load_historical_weather(lat, lon, start, end, api_key, units=units).assign(kind="history"))
+
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True).assign(location=location['name'], lat=lat, lon=lon)
+
+
+def fetch_batch(locations, api_key, kinds=("current", "forecast"), units="metric", history_days=5, max_workers=None, rate_limiter=None):  # Returns one long-format DataFrame for many locations.
+    with ThreadPoolExecutor(max_workers=max_workers or config.BATCH_MAX_WORKERS, thread_name_prefix="weather-batch") as executor:
+        futures = [executor.submit(_fetch_location, location, api_key, kinds, units, history_days, rate_limiter) for location in locations]
+
+    frames = []  # Initializes an empty list to store the DataFrame of each location.
+    for location, future in zip(locations, futures):
+        try:
+            frame = future.result()
+        except Exception as exc:  # A failed location is left out instead of failing the whole batch.
+            print(f"Error fetching weather data for {location['name']}: {exc}")
+            continue
+        if frame is not None:
+            frames.append(frame)
+
+    if not frames:  # Same columns and types as a normal result, just without rows.
+        frames = [entries_to_frame([]).assign(kind=pd.Series(dtype=str), location=pd.Series(dtype=str),
+                                              lat=pd.Series(dtype='float64'), lon=pd.Series(dtype='float64'))]
+    columns = ['location', 'lat', 'lon', 'kind'] + list(entries_to_frame([]).columns)  # Identifying columns first, then the weather columns.
+    return pd.concat(frames, ignore_index=True)[columns]  # One row per location, kind and timestamp.
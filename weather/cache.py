@@ -0,0 +1,267 @@
+import functools  # Used to keep the name and signature of the wrapped fetchers.
+import inspect  # Used to build cache keys from the arguments of the wrapped fetchers.
+import json  # Used to build cache keys and to store responses in the SQLite and Redis backends.
+import sqlite3  # Used by the file-based backend shared by several worker processes.
+import threading  # Used to protect shared state and to coalesce concurrent misses.
+import time  # Used to compute expiry times.
+from collections import OrderedDict  # Keeps entries in least-recently-used order for the in-memory backend.
+from concurrent.futures import Future  # Lets concurrent misses for the same key wait on a single upstream call.
+
+from weather import config  # Shared settings (backend, TTLs and size limits).
+
+try:  # 'redis' is optional and only needed for the Redis backend.
+    import redis
+except ImportError:
+    redis = None
+
+# Arguments that do not change the response and are therefore left out of cache keys.
+IGNORED_ARGUMENTS = ("api_key", "timeout")
+
+
+# --- Task: In-process backend with LRU eviction ---
+
+class MemoryBackend:  # Keeps responses in a bounded, least-recently-used dictionary inside the current process.
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or config.CACHE_MAX_ENTRIES  # Entries beyond this limit evict the least recently used.
+        self._entries = OrderedDict()  # Maps each key to (value, expires_at), oldest first.
+        self._lock = threading.Lock()  # Protects the dictionary when several threads share the cache.
+
+    def get(self, key):  # Returns (value, expires_at) or None if the key is missing or expired.
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():  # Expired entries are dropped on access.
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)  # Marks the entry as recently used.
+            return entry
+
+    def set(self, key, value, ttl):  # Stores a value for 'ttl' seconds.
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:  # Evicts the least recently used entries.
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# --- Task: SQLite backend shared by several worker processes on one machine ---
+
+class SQLiteBackend:  # Keeps responses in a SQLite file so every gunicorn worker on the host shares them.
+    def __init__(self, path, max_entries=None):
+        self.path = path  # Location of the database file.
+        self.max_entries = max_entries or config.CACHE_MAX_ENTRIES  # Entries beyond this limit evict the least recently used.
+        self.touch_seconds = config.CACHE_TOUCH_SECONDS  # Precision of the recorded use, traded for fewer writes on the read path.
+        self._local = threading.local()  # SQLite connections cannot be shared between threads, so each thread opens its own.
+        self._writes = 0  # Number of writes since the last clean-up.
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires_at REAL, used_at REAL)"
+            )
+
+    def _connection(self):  # Returns the connection of the current thread, opening it on first use.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")  # Lets readers and a writer from different processes work at the same time.
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):  # Returns (value, expires_at) or None if the key is missing or expired.
+        now = time.time()
+        with self._connection() as connection:
+            row = connection.execute("SELECT value, expires_at, used_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            if row[2] < now - self.touch_seconds:  # Most hits stay reads; the eviction order only needs to be roughly right.
+                connection.execute("UPDATE cache SET used_at = ? WHERE key = ?", (now, key))  # Marks the entry as recently used.
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, ttl):  # Stores a value for 'ttl' seconds.
+        now = time.time()
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:  # Expired and least recently used entries are cleaned up every 100 writes.
+                connection.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+                connection.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+
+    def __len__(self):
+        return self._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+# --- Task: Redis backend shared by workers on several machines ---
+
+class RedisBackend:  # Keeps responses in a Redis-compatible store; eviction is left to the server's 'maxmemory-policy'.
+    def __init__(self, url, prefix="weather:"):
+        if redis is None:
+            raise ImportError("The Redis cache backend requires the 'redis' package (pip install redis)")
+        self.prefix = prefix  # Namespaces the keys so the store can be shared with other applications.
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, key):  # Returns (value, expires_at) or None if the key is missing or expired.
+        raw = self._redis.get(self.prefix + key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["value"], entry["expires_at"]
+
+    def set(self, key, value, ttl):  # Stores a value for 'ttl' seconds; Redis removes it once it expires.
+        entry = {"value": value, "expires_at": time.time() + ttl}
+        self._redis.set(self.prefix + key, json.dumps(entry), ex=max(int(ttl), 1))
+
+    def __len__(self):
+        return self._redis.dbsize()
+
+
+def create_backend(spec=None):  # Builds a backend from a spec such as 'memory', 'sqlite:///cache.db' or 'redis://localhost:6379/0'.
+    spec = spec or config.CACHE_BACKEND
+    if spec == "memory":
+        return MemoryBackend()
+    if spec.startswith("sqlite:///"):
+        return SQLiteBackend(spec[len("sqlite:///"):])
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(spec)
+    raise ValueError(f"Unknown cache backend: {spec}")
+
+
+# --- Task: Response cache with per-type TTLs and request coalescing ---
+
+class ResponseCache:  # Sits in front of the fetchers and answers repeated requests without calling the API.
+    def __init__(self, backend=None, ttls=None):
+        self.backend = backend or MemoryBackend()  # Where responses are stored.
+        self.ttls = dict(config.CACHE_TTLS, **(ttls or {}))  # Freshness per response type ('geocode', 'current', ...).
+        self._inflight = {}  # Maps each key being fetched to the Future other callers wait on.
+        self._lock = threading.Lock()  # Protects '_inflight' and the counters below.
+        self._hits = 0  # Requests answered from the cache.
+        self._misses = 0  # Requests that had to call the API.
+        self._coalesced = 0  # Requests that waited on another caller's API call instead of making their own.
+
+    def lookup(self, key):  # Returns (value, expires_at) for a fresh entry, or None; backend failures count as a miss.
+        try:
+            return self.backend.get(key)
+        except Exception as exc:
+            print(f"Error reading from the response cache: {exc}")
+            return None
+
+    def store(self, kind, key, value):  # Stores a response; failed requests (None) are never cached.
+        if value is None:
+            return
+        try:
+            self.backend.set(key, value, self.ttls[kind])
+        except Exception as exc:
+            print(f"Error writing to the response cache: {exc}")
+
+    def get_or_fetch(self, kind, key, fetch):  # Returns the cached response, or calls 'fetch' once for all concurrent callers.
+        entry = self.lookup(key)
+        if entry is not None:
+            with self._lock:
+                self._hits += 1
+            return entry[0]
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None  # The first caller makes the API request; the others wait for its result.
+            if owner:
+                future = self._inflight[key] = Future()
+                self._misses += 1
+            else:
+                self._coalesced += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = fetch()
+            self.store(kind, key, value)
+            future.set_result(value)
+            return value
+        except Exception as exc:
+            future.set_exception(exc)  # Waiting callers see the same error.
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def stats(self):  # Returns the counters used to follow the cache's effectiveness.
+        with self._lock:
+            lookups = self._hits + self._misses + self._coalesced
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "hit_rate": round((self._hits + self._coalesced) / lookups, 4) if lookups else 0.0,
+            }
+
+
+# --- Task: One cache per process, shared by all fetchers ---
+
+_cache = None  # The shared cache, created on first use.
+_cache_lock = threading.Lock()  # Makes sure only one cache is created when several threads start at once.
+
+
+def get_cache():  # Returns the shared cache, creating it from the settings in 'config' on first use.
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(create_backend())
+    return _cache
+
+
+def configure_cache(backend=None, ttls=None):  # Replaces the shared cache, e.g. configure_cache("sqlite:///weather_cache.db").
+    global _cache
+    if isinstance(backend, str) or backend is None:
+        backend = create_backend(backend)
+    with _cache_lock:
+        _cache = ResponseCache(backend, ttls)
+    return _cache
+
+
+def _normalize(value):  # Makes equivalent arguments produce the same key ('London ' and 'london', 51.50731 and 51.5073).
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, float):
+        return round(value, 4)
+    return value
+
+
+def cached(kind):  # Decorator that puts a fetcher behind the shared cache, using the TTL configured for 'kind'.
+    def decorator(fetch):
+        signature = inspect.signature(fetch)
+
+        def make_key(*args, **kwargs):  # Builds the cache key from every argument that changes the response.
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            parts = [_normalize(value) for name, value in bound.arguments.items() if name not in IGNORED_ARGUMENTS]
+            return f"{kind}:{json.dumps(parts)}"
+
+        @functools.wraps(fetch)
+        def wrapper(*args, **kwargs):
+            return get_cache().get_or_fetch(kind, make_key(*args, **kwargs), lambda: fetch(*args, **kwargs))
+
+        def refresh(*args, **kwargs):  # Calls the API even if a fresh entry exists and stores the new response.
+            value = fetch(*args, **kwargs)
+            get_cache().store(kind, make_key(*args, **kwargs), value)
+            return value
+
+        def expires_in(*args, **kwargs):  # Seconds until the cached response expires, or None if nothing is cached.
+            entry = get_cache().lookup(make_key(*args, **kwargs))
+            return None if entry is None else entry[1] - time.time()
+
+        wrapper.uncached = fetch  # The original fetcher, for callers that must bypass the cache.
+        wrapper.refresh = refresh
+        wrapper.expires_in = expires_in
+        wrapper.cache_key = make_key
+        return wrapper
+
+    return decorator
@@ -0,0 +1,47 @@
+import time  # Used to measure each part's time budget from the moment the requests were sent.
+from concurrent.futures import ThreadPoolExecutor, wait  # Thread pool used to run the blocking API requests side by side.
+
+from weather import config  # Shared settings (API base URLs and request timeouts).
+from weather.current_weather import get_weather_by_coordinates  # Fetches the current weather for a location.
+from weather.forecast import get_forecast_by_coordinates  # Fetches the 5-day forecast for a location.
+from weather.history_store import load_historical_weather  # Reads history from the local store, fetching only the missing hours.
+
+# Parts of the dashboard, in the order their results are collected.
+DASHBOARD_PARTS = ("current", "forecast", "history")
+
+# --- Task: Shared worker pool for the dashboard fan-out ---
+
+# A single pool is reused for every dashboard request so threads are not created and torn down on each click.
+_executor = ThreadPoolExecutor(max_workers=12, thread_name_prefix="weather-fetch")  # Enough workers for several concurrent dashboard users.
+
+
+# --- Task: Fetching current weather, forecast and history in parallel ---
+
+def fetch_dashboard_data(lat, lon, start, end, api_key, units="metric", timeout=None, request_timeout=None,
+                         history_timeout=None, parts=DASHBOARD_PARTS):  # Runs the requested dashboard parts concurrently once the city has been geocoded.
+    timeout = timeout or config.DASHBOARD_FETCH_TIMEOUT  # Time budget for the current weather and forecast.
+    history_timeout = history_timeout or config.HISTORY_FETCH_TIMEOUT  # Separate budget for history, which may need a long backfill.
+    request_timeout = request_timeout or config.REQUEST_TIMEOUT  # Time budget for each individual API request.
+
+    submitters = {  # How each part is fetched.
+        "current": lambda: _executor.submit(get_weather_by_coordinates, lat, lon, api_key, units=units, timeout=request_timeout),
+        "forecast": lambda: _executor.submit(get_forecast_by_coordinates, lat, lon, api_key, units=units, timeout=request_timeout),
+        "history": lambda: _executor.submit(load_historical_weather, lat, lon, start, end, api_key, units=units, timeout=request_timeout),
+    }
+    started = time.monotonic()
+    futures = {name: submitters[name]() for name in parts}  # Submits every request to the pool straight away so they all run at the same time.
+
+    results = {name: None for name in parts}  # Missing parts stay None so the caller can still render the rest.
+    for name, future in futures.items():  # Each part only waits for its own budget, so a slow history never holds up the others.
+        budget = history_timeout if name == "history" else timeout
+        done, _ = wait([future], timeout=max(0.0, budget - (time.monotonic() - started)))
+        if not done:  # Requests still running after their time budget are given up on.
+            future.cancel()  # Cancels the request if it has not started yet (running ones finish in the background).
+            print(f"Timed out fetching {name} data after {budget} seconds")  # Prints which part of the dashboard is missing.
+            continue
+        try:
+            results[name] = future.result()  # Stores the JSON payload or history DataFrame (or None if the API reported an error).
+        except Exception as exc:  # Network errors and timeouts only drop this part of the dashboard.
+            print(f"Error fetching {name} data: {exc}")  # Prints an error message indicating the failure.
+
+    return results  # Returns a dictionary with the 'current' and 'forecast' payloads and the 'history' DataFrame (for the requested parts).
@@ -0,0 +1,53 @@
+import os  # The 'os' module is used to read optional overrides from environment variables.
+
+# --- Task: Central settings shared by all weather fetchers ---
+
+# Base URLs for the OpenWeatherMap services (overridable so the app can be pointed at a local stub server).
+API_BASE_URL = os.getenv("WEATHER_API_BASE_URL", "https://api.openweathermap.org")  # Host serving the geocoding, current weather and forecast APIs.
+HISTORY_BASE_URL = os.getenv("WEATHER_HISTORY_BASE_URL", "https://history.openweathermap.org")  # Host serving the historical weather API.
+
+# Timeouts (in seconds) applied to every upstream request.
+REQUEST_TIMEOUT = float(os.getenv("WEATHER_REQUEST_TIMEOUT", "5"))  # Maximum time a single API request may take before it is abandoned.
+DASHBOARD_FETCH_TIMEOUT = float(os.getenv("WEATHER_DASHBOARD_FETCH_TIMEOUT", "8"))  # Maximum time the dashboard waits for the current weather and forecast requests together.
+HISTORY_FETCH_TIMEOUT = float(os.getenv("WEATHER_HISTORY_FETCH_TIMEOUT", "20"))  # Maximum time the history panel waits for its data (long ranges need a multi-request backfill).
+
+# Settings for the shared HTTP client used by every fetcher.
+HTTP_POOL_SIZE = int(os.getenv("WEATHER_HTTP_POOL_SIZE", "16"))  # Number of keep-alive connections kept open per host.
+HTTP_RETRIES = int(os.getenv("WEATHER_HTTP_RETRIES", "2"))  # How many times a failed request (connection error, 429 or 5xx) is retried.
+HTTP_BACKOFF_FACTOR = float(os.getenv("WEATHER_HTTP_BACKOFF_FACTOR", "0.3"))  # Base delay in seconds for the exponential backoff between retries.
+HTTP2_ENABLED = os.getenv("WEATHER_HTTP2", "").lower() in ("1", "true", "yes")  # Uses HTTP/2 when the optional 'httpx[http2]' package is installed.
+
+# Settings for the response cache placed in front of the fetchers.
+CACHE_BACKEND = os.getenv("WEATHER_CACHE_BACKEND", "memory")  # 'memory', 'sqlite:///path/to/cache.db' or 'redis://host:6379/0'.
+CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "2048"))  # Maximum number of responses kept before the least recently used are evicted.
+CACHE_TOUCH_SECONDS = float(os.getenv("WEATHER_CACHE_TOUCH_SECONDS", "60"))  # A shared (SQLite) cache hit only records its use if the last record is older than this.
+CACHE_TTLS = {  # How long (in seconds) each type of response stays fresh.
+    "geocode": int(os.getenv("WEATHER_CACHE_TTL_GEOCODE", str(30 * 24 * 3600))),  # City coordinates practically never change.
+    "current": int(os.getenv("WEATHER_CACHE_TTL_CURRENT", "600")),  # Current weather is updated every few minutes.
+    "forecast": int(os.getenv("WEATHER_CACHE_TTL_FORECAST", "3600")),  # Forecasts are refreshed about once an hour.
+    "history": int(os.getenv("WEATHER_CACHE_TTL_HISTORY", "3600")),  # Past hours do not change, but the latest hour is still filling in.
+}
+
+# Settings for historical backfills and the global API rate limit.
+API_CALLS_PER_SECOND = float(os.getenv("WEATHER_API_CALLS_PER_SECOND", "20"))  # Upstream requests allowed per second by the shared HTTP client (per process).
+HISTORY_WINDOW_HOURS = int(os.getenv("WEATHER_HISTORY_WINDOW_HOURS", "168"))  # Largest range a single history request may cover (the API returns at most one week).
+HISTORY_MAX_WORKERS = int(os.getenv("WEATHER_HISTORY_MAX_WORKERS", "8"))  # Number of history windows fetched at the same time.
+
+# Settings for the local on-disk store of historical weather data.
+HISTORY_STORE_DIR = os.getenv("WEATHER_HISTORY_STORE_DIR", "weather_history_store")  # Directory holding the stored hourly history per location.
+HISTORY_SETTLE_SECONDS = int(os.getenv("WEATHER_HISTORY_SETTLE_SECONDS", str(3 * 3600)))  # Recent hours that may still change and are always fetched again.
+
+# Settings for multi-city batch fetching.
+BATCH_MAX_WORKERS = int(os.getenv("WEATHER_BATCH_MAX_WORKERS", "16"))  # Number of locations fetched at the same time.
+
+# Settings for the background prefetch of frequently requested cities.
+PREFETCH_ENABLED = os.getenv("WEATHER_PREFETCH", "1").lower() in ("1", "true", "yes")  # Starts the scheduler with the first dashboard request.
+PREFETCH_TOP_K = int(os.getenv("WEATHER_PREFETCH_TOP_K", "10"))  # Number of most requested cities kept warm.
+PREFETCH_CALLS_PER_MINUTE = int(os.getenv("WEATHER_PREFETCH_CALLS_PER_MINUTE", "30"))  # API calls the scheduler may spend per minute, per process; they also count against WEATHER_API_CALLS_PER_SECOND.
+PREFETCH_LEAD_SECONDS = int(os.getenv("WEATHER_PREFETCH_LEAD_SECONDS", "120"))  # How long before expiry a cached response is refreshed.
+PREFETCH_INTERVAL_SECONDS = float(os.getenv("WEATHER_PREFETCH_INTERVAL_SECONDS", "30"))  # Time between two checks of the hot cities.
+PREFETCH_JITTER_SECONDS = float(os.getenv("WEATHER_PREFETCH_JITTER_SECONDS", "10"))  # Random extra delay so workers and cities do not refresh in lockstep.
+PREFETCH_DECAY_SECONDS = int(os.getenv("WEATHER_PREFETCH_DECAY_SECONDS", "3600"))  # Query counts are halved this often so the hot list follows current traffic.
+
+# Settings for the built-in performance metrics.
+METRICS_ENABLED = os.getenv("WEATHER_METRICS", "").lower() in ("1", "true", "yes")  # Serves the stage histograms at '/metrics' in the Prometheus text format.
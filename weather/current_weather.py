@@ -1,16 +1,19 @@
-import requests  # 'requests' is used for making HTTP requests to the OpenWeatherMap API.
+from weather import config  # Shared settings (API base URLs and request timeouts).
+from weather.cache import cached  # Response cache with a separate TTL per type of data.
+from weather.http_client import get_client  # Shared pooled, keep-alive HTTP client used for every API request.
 
 # --- Task: Fetching city coordinates using OpenWeatherMap Geocoding API ---
 
-def get_city_coordinates(city_name, api_key):  # This function retrieves the geographical coordinates of a city by name.
-    geocode_url = "https://api.openweathermap.org/geo/1.0/direct"  # The URL endpoint to access the OpenWeatherMap Geocoding API.
+@cached("geocode")  # Cached for a long time since city coordinates practically never change.
+def get_city_coordinates(city_name, api_key, timeout=None):  # This function retrieves the geographical coordinates of a city by name.
+    geocode_url = f"{config.API_BASE_URL}/geo/1.0/direct"  # The URL endpoint to access the OpenWeatherMap Geocoding API.
     params = {  # Defining the query parameters for the API request.
         "q": city_name,  # 'q' is the query, which in this case is the name of the city.
         "limit": 1,  # Limits the number of results returned to 1 (since we only need one city's data).
         "appid": api_key  # 'appid' is the API key required for authentication with OpenWeatherMap.
     }
 
-    response = requests.get(geocode_url, params=params)  # Makes an HTTP GET request to the API with the defined parameters.
+    response = get_client().get(geocode_url, params=params, timeout=timeout)  # Makes an HTTP GET request to the API over a pooled connection with the defined parameters.
     if response.status_code == 200:  # Checks if the API request was successful (status code 200 means OK).
         data = response.json()  # Converts the API response to JSON format.
         if data:  # If the data is not empty (i.e., the city was found)...
@@ -25,8 +28,9 @@ def get_city_coordinates(city_name, api_key):  # This function retrieves the geo
 
 # --- Task: Fetching current weather data for a city ---
 
-def get_weather_by_coordinates(lat, lon, api_key, units="metric"):  # This function retrieves the current weather for a given latitude and longitude.
-    weather_url = "https://api.openweathermap.org/data/2.5/weather"  # The URL endpoint to access the OpenWeatherMap current weather API.
+@cached("current")  # Cached for a few minutes so repeated requests for the same location skip the API.
+def get_weather_by_coordinates(lat, lon, api_key, units="metric", timeout=None):  # This function retrieves the current weather for a given latitude and longitude.
+    weather_url = f"{config.API_BASE_URL}/data/2.5/weather"  # The URL endpoint to access the OpenWeatherMap current weather API.
     params = {  # Defining the query parameters for the API request.
         "lat": lat,  # 'lat' specifies the latitude of the location.
         "lon": lon,  # 'lon' specifies the longitude of the location.
@@ -34,7 +38,7 @@ def get_weather_by_coordinates(lat, lon, api_key, units="metric"):  # This funct
         "units": units  # 'units' determines whether the temperature is returned in metric (Celsius) or imperial (Fahrenheit).
     }
 
-    response = requests.get(weather_url, params=params)  # Makes an HTTP GET request to the API with the defined parameters.
+    response = get_client().get(weather_url, params=params, timeout=timeout)  # Makes an HTTP GET request to the API over a pooled connection with the defined parameters.
     if response.status_code == 200:  # Checks if the API request was successful (status code 200 means OK).
         return response.json()  # If successful, returns the API response in JSON format.
     else:  # If the request failed...
@@ -1,9 +1,17 @@
-import requests  # 'requests' is used to make HTTP requests to external services (like APIs).
+from concurrent.futures import ThreadPoolExecutor, as_completed  # Bounded worker pool used to fetch history windows concurrently.
+
+import pandas as pd  # Used to merge the history windows into a single DataFrame.
+
+from weather import config  # Shared settings (API base URLs and request timeouts).
+from weather.cache import cached  # Response cache with a separate TTL per type of data.
+from weather.http_client import get_client  # Shared pooled, keep-alive HTTP client used for every API request.
+from weather.processing import entries_to_frame  # Converts API entries into a typed DataFrame.
 
 # --- Task: Fetching historical weather data from OpenWeatherMap API ---
 
-def get_historical_weather(lat, lon, start, end, api_key, units="metric"):  # This function retrieves historical weather data for a given location.
-    history_url = "https://history.openweathermap.org/data/2.5/history/city"  # The URL endpoint to access the OpenWeatherMap historical weather API.
+@cached("history")  # Cached so repeated requests for the same time range skip the API.
+def get_historical_weather(lat, lon, start, end, api_key, units="metric", timeout=None):  # This function retrieves historical weather data for a given location.
+    history_url = f"{config.HISTORY_BASE_URL}/data/2.5/history/city"  # The URL endpoint to access the OpenWeatherMap historical weather API.
     params = {  # Defining the query parameters for the API request.
         "lat": lat,  # 'lat' specifies the latitude of the location.
         "lon": lon,  # 'lon' specifies the longitude of the location.
@@ -14,7 +22,7 @@ def get_historical_weather(lat, lon, start, end, api_key, units="metric"):  # Th
         "units": units  # 'units' determines whether the temperature is returned in metric (Celsius) or imperial (Fahrenheit).
     }
 
-    response = requests.get(history_url, params=params)  # Makes an HTTP GET request to the API with the defined parameters.
+    response = get_client().get(history_url, params=params, timeout=timeout)  # Makes an HTTP GET request to the API over a pooled connection with the defined parameters.
     if response.status_code == 200:  # Checks if the API request was successful (status code 200 means OK).
         return response.json()  # If successful, returns the API response in JSON format.
     else:  # If the request failed...
@@ -25,25 +33,63 @@ def get_historical_weather(lat, lon, start, end, api_key, units="metric"):  # Th
 # --- Task: Processing historical weather data into a structured format ---
 
 def process_historical_weather_data(weather_data):  # This function processes the raw historical weather data.
-    processed_data = []  # Initializes an empty list to store the processed data.
+    df = entries_to_frame(weather_data['list'])  # Builds the datetime (UTC), temperature, humidity, pressure, wind and cloud columns in bulk.
+    return df  # Returns the DataFrame containing the processed historical weather data.
 
-    for item in weather_data['list']:  # Loops through each item in the 'list' of weather data.
-        from datetime import datetime  # Importing datetime to handle date and time conversion.
 
-        dt = datetime.utcfromtimestamp(item['dt']).strftime('%Y-%m-%d %H:%M:%S')  # Converts the Unix timestamp ('dt') to a formatted date and time.
+# --- Task: Splitting a date range into API-sized windows ---
 
-        temp = item['main']['temp']  # Extracts the main temperature ('temp') for this time period.
-        temp_min = item['main']['temp_min']  # Extracts the minimum temperature ('temp_min') for this time period.
-        temp_max = item['main']['temp_max']  # Extracts the maximum temperature ('temp_max') for this time period.
+def split_time_range(start, end, window_seconds=None):  # Splits [start, end) into windows the history API can answer in one request.
+    window_seconds = window_seconds or config.HISTORY_WINDOW_HOURS * 3600  # Largest range a single request may cover.
+    windows = []  # Initializes an empty list to store the (start, end) pairs.
+    window_start = start - start % window_seconds  # Windows are aligned to a fixed grid so repeated backfills reuse cached windows.
+    while window_start < end:  # Walks through the range one window at a time.
+        window_end = window_start + window_seconds  # The end of this window.
+        windows.append((max(window_start, start), min(window_end, end)))  # Clips the first and last window to the requested range.
+        window_start = window_end  # Moves on to the next window.
+    return windows  # Returns the list of windows in chronological order.
 
-        # Appends a dictionary with the processed data (datetime, temp, min temp, max temp) to the list.
-        processed_data.append({
-            'datetime': dt,  # Stores the formatted date and time.
-            'temp': temp,  # Stores the average temperature.
-            'temp_min': temp_min,  # Stores the minimum temperature.
-            'temp_max': temp_max  # Stores the maximum temperature.
-        })
 
-    import pandas as pd  # Importing pandas to structure the processed data into a DataFrame.
-    df = pd.DataFrame(processed_data)  # Converts the processed data into a pandas DataFrame.
-    return df  # Returns the DataFrame containing the processed historical weather data.
+# --- Task: Fetching arbitrary date ranges of historical weather data ---
+
+def _fetch_window(lat, lon, start, end, api_key, units, timeout, rate_limiter):  # Fetches and processes one history window.
+    if rate_limiter is not None and get_historical_weather.expires_in(lat, lon, start, end, api_key, units=units) is None:  # A caller's own limiter is only used up by requests that reach the API.
+        rate_limiter.acquire()  # Waits for it on top of the global limit the HTTP client applies.
+    weather_data = get_historical_weather(lat, lon, start, end, api_key, units=units, timeout=timeout)  # Fetches the window (cached windows are returned immediately).
+    if not weather_data:  # If the window could not be fetched...
+        return None  # Returns None so the caller can skip it.
+    return process_historical_weather_data(weather_data)  # Converts the window into a DataFrame.
+
+
+def backfill_historical_weather(lat, lon, start, end, api_key, units="metric", max_workers=None, rate_limiter=None, timeout=None):  # Retrieves historical weather data for any date range.
+    df, failed_windows = backfill_with_failures(lat, lon, start, end, api_key, units, max_workers, rate_limiter, timeout)  # Fetches every window of the range.
+    return df  # Returns the DataFrame containing the historical weather data for the whole range.
+
+
+def backfill_with_failures(lat, lon, start, end, api_key, units="metric", max_workers=None, rate_limiter=None, timeout=None):  # Same as 'backfill_historical_weather', but also reports the windows that could not be fetched.
+    windows = split_time_range(start, end)  # Splits the range into windows the API can answer in one request.
+    max_workers = max_workers or config.HISTORY_MAX_WORKERS  # Number of windows fetched at the same time.
+
+    frames = []  # Initializes an empty list to store the DataFrame of each window as it arrives.
+    failed_windows = []  # Initializes an empty list to store the windows that could not be fetched.
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(windows) or 1), thread_name_prefix="weather-backfill") as executor:  # Bounded pool, so long ranges cannot flood the API.
+        futures = {executor.submit(_fetch_window, lat, lon, window_start, window_end, api_key, units, timeout, rate_limiter): (window_start, window_end)
+                   for window_start, window_end in windows}  # Submits every window to the pool.
+        for future in as_completed(futures):  # Processes the windows in the order they finish.
+            try:
+                frame = future.result()  # The DataFrame of this window (or None if it could not be fetched).
+            except Exception as exc:  # Network errors and timeouts only leave a gap in the data.
+                print(f"Error fetching historical weather data for window {futures[future]}: {exc}")  # Prints an error message indicating the failure.
+                frame = None
+            if frame is None:  # Remembers the windows that failed so callers can retry them later.
+                failed_windows.append(futures[future])
+            elif not frame.empty:  # Skips empty windows.
+                frames.append(frame)
+
+    if not frames:  # If no window returned any data...
+        return entries_to_frame([]), sorted(failed_windows)  # Returns an empty DataFrame with the usual columns.
+
+    df = pd.concat(frames, ignore_index=True)  # Merges the windows into a single DataFrame.
+    in_range = (df['datetime'] >= pd.Timestamp(start, unit='s', tz='UTC')) & (df['datetime'] <= pd.Timestamp(end, unit='s', tz='UTC'))  # Keeps only the requested range.
+    df = df[in_range].drop_duplicates(subset='datetime').sort_values('datetime')  # Removes hours returned by two neighbouring windows and sorts by time.
+    return df.reset_index(drop=True), sorted(failed_windows)  # Returns the merged DataFrame and the windows that are missing from it.
@@ -0,0 +1,173 @@
+import json  # Used to read and write the metadata file of each location.
+import os  # Used to build paths and to replace files atomically.
+import shutil  # Used to remove superseded generations of column files.
+import threading  # Used to serialise writers inside one process.
+import time  # Used to decide which recent hours are still settling.
+
+import numpy as np  # Columns are stored as NumPy arrays and read back through memory maps.
+import pandas as pd  # Used to convert between stored columns and DataFrames.
+
+from weather import config  # Shared settings (store directory and settle time).
+from weather.historical_weather import backfill_with_failures  # Fetches the hours that are missing from the store.
+from weather.processing import MAIN_COLUMNS, EXTRA_COLUMNS, entries_to_frame  # Column layout of history DataFrames.
+
+try:  # 'fcntl' is only available on Unix; elsewhere only writers inside the same process are serialised.
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Type of every stored column; 'dt' holds the Unix timestamp of each hour.
+COLUMN_DTYPES = dict({"dt": np.int64}, **MAIN_COLUMNS, **{name: np.float32 for _, _, name in EXTRA_COLUMNS})
+
+
+# --- Task: On-disk columnar store of hourly history per location ---
+
+class HistoryStore:  # Keeps hourly history for each (lat, lon, units) as one memory-mapped .npy file per column.
+    def __init__(self, root=None):
+        self.root = root or config.HISTORY_STORE_DIR  # Directory holding one sub-directory per location.
+        self._locks = {}  # One lock per location, so writers in this process do not overwrite each other.
+        self._locks_guard = threading.Lock()  # Protects the dictionary of locks.
+
+    def _location_dir(self, lat, lon, units):  # Directory holding the data of one location.
+        return os.path.join(self.root, f"{round(lat, 4)}_{round(lon, 4)}_{units}")
+
+    def _lock(self, location_dir):  # Returns the in-process lock of a location.
+        with self._locks_guard:
+            return self._locks.setdefault(location_dir, threading.Lock())
+
+    def read_meta(self, lat, lon, units):  # Returns the metadata of a location (covered range, row count, generation) or None.
+        try:
+            with open(os.path.join(self._location_dir(lat, lon, units), "meta.json")) as meta_file:
+                return json.load(meta_file)
+        except FileNotFoundError:
+            return None
+
+    def _open_columns(self, location_dir, meta):  # Opens every column of the current generation as a read-only memory map.
+        generation_dir = os.path.join(location_dir, f"gen-{meta['generation']}")
+        return {name: np.load(os.path.join(generation_dir, f"{name}.npy"), mmap_mode='r') for name in COLUMN_DTYPES}
+
+    def read_range(self, lat, lon, units, start, end, retry=True):  # Returns the stored hours between 'start' and 'end' (Unix timestamps) as a DataFrame.
+        meta = self.read_meta(lat, lon, units)
+        if meta is None or meta["rows"] == 0:
+            return entries_to_frame([])
+        try:
+            columns = self._open_columns(self._location_dir(lat, lon, units), meta)
+        except FileNotFoundError:  # A writer replaced this generation between reading the metadata and opening the files.
+            if not retry:
+                raise
+            return self.read_range(lat, lon, units, start, end, retry=False)
+        first = np.searchsorted(columns["dt"], start, side='left')  # Binary search on the sorted timestamps; only the matching slice is read from disk.
+        last = np.searchsorted(columns["dt"], end, side='right')
+        frame = {"datetime": pd.to_datetime(np.array(columns["dt"][first:last]), unit='s', utc=True)}
+        for name in COLUMN_DTYPES:
+            if name != "dt":
+                frame[name] = np.array(columns[name][first:last])  # Copies the slice out of the memory map.
+        return pd.DataFrame(frame)
+
+    def write(self, lat, lon, units, df, covered_start=None, covered_end=None):  # Merges new hours into the store and extends the covered range (if given).
+        location_dir = self._location_dir(lat, lon, units)
+        os.makedirs(location_dir, exist_ok=True)
+        with self._lock(location_dir), open(os.path.join(location_dir, "lock"), "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)  # Serialises writers from other worker processes.
+
+            meta = self.read_meta(lat, lon, units)
+            new_columns = {"dt": df['datetime'].dt.tz_localize(None).to_numpy(dtype='datetime64[s]').astype(np.int64)}
+            for name, dtype in COLUMN_DTYPES.items():
+                if name != "dt":
+                    new_columns[name] = df[name].to_numpy(dtype=dtype)
+
+            if meta is not None and meta["rows"] > 0:  # Appends the new hours to the stored ones.
+                old_columns = self._open_columns(location_dir, meta)
+                merged = {name: np.concatenate([old_columns[name], new_columns[name]]) for name in COLUMN_DTYPES}
+            else:
+                merged = new_columns
+
+            if meta is not None and meta["covered_start"] is not None:  # The covered range only ever grows.
+                if covered_start is None or covered_start > meta["covered_end"] or covered_end < meta["covered_start"]:  # A range that does not touch the covered one would hide the gap between them.
+                    covered_start, covered_end = meta["covered_start"], meta["covered_end"]
+                else:
+                    covered_start = min(covered_start, meta["covered_start"])
+                    covered_end = max(covered_end, meta["covered_end"])
+
+            # Sorts by time and keeps the last copy of every hour, so refetched hours replace the stored ones.
+            order = np.argsort(merged["dt"], kind='stable')
+            timestamps = merged["dt"][order]
+            keep = np.append(timestamps[1:] != timestamps[:-1], True) if len(timestamps) else np.array([], dtype=bool)
+            merged = {name: values[order][keep] for name, values in merged.items()}
+
+            generation = (meta["generation"] + 1) if meta is not None else 0
+            generation_dir = os.path.join(location_dir, f"gen-{generation}")
+            os.makedirs(generation_dir, exist_ok=True)
+            for name, values in merged.items():  # Writes the new generation next to the current one.
+                np.save(os.path.join(generation_dir, f"{name}.npy"), np.ascontiguousarray(values, dtype=COLUMN_DTYPES[name]))
+
+            new_meta = {"generation": generation, "rows": int(len(merged["dt"])),
+                        "covered_start": covered_start, "covered_end": covered_end}
+            meta_path = os.path.join(location_dir, "meta.json")
+            with open(meta_path + ".tmp", "w") as meta_file:
+                json.dump(new_meta, meta_file)
+            os.replace(meta_path + ".tmp", meta_path)  # Switches readers to the new generation in one atomic step.
+
+            if meta is not None:  # Removes the previous generation; open memory maps stay valid until they are closed.
+                shutil.rmtree(os.path.join(location_dir, f"gen-{meta['generation']}"), ignore_errors=True)
+            return new_meta
+
+    def missing_ranges(self, lat, lon, units, start, end):  # Returns the parts of [start, end] that are not in the store yet.
+        meta = self.read_meta(lat, lon, units)
+        if meta is None or meta["covered_start"] is None:
+            return [(start, end)]
+        covered_start, covered_end = meta["covered_start"], meta["covered_end"]
+        ranges = []
+        if start < covered_start:  # Hours older than the covered range; also fills any gap up to it, keeping the range contiguous.
+            ranges.append((start, covered_start))
+        if end > covered_end:  # Hours since the last sync; also fills any gap after the covered range.
+            ranges.append((covered_end, end))
+        return ranges
+
+
+# --- Task: One store per process ---
+
+_store = None  # The shared store, created on first use.
+_store_lock = threading.Lock()  # Makes sure only one store is created when several threads start at once.
+
+
+def get_history_store():  # Returns the shared store, using the directory configured in 'config'.
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = HistoryStore()
+    return _store
+
+
+def configure_history_store(root=None):  # Replaces the shared store, e.g. configure_history_store(tempfile.mkdtemp()).
+    global _store
+    with _store_lock:
+        _store = HistoryStore(root)
+    return _store
+
+
+# --- Task: Fetching only the hours missing since the last sync ---
+
+def _already_stored(store, lat, lon, units, df):  # True if the store already holds exactly these hours (e.g. the same cached response).
+    first, last = (int(timestamp.timestamp()) for timestamp in (df['datetime'].iloc[0], df['datetime'].iloc[-1]))
+    stored = store.read_range(lat, lon, units, first, last)
+    return len(stored) == len(df) and stored.equals(df[stored.columns].reset_index(drop=True))
+
+
+def load_historical_weather(lat, lon, start, end, api_key, units="metric", timeout=None):  # Retrieves historical weather data, fetching only hours not stored yet.
+    store = get_history_store()
+    settled = int(time.time()) - config.HISTORY_SETTLE_SECONDS  # Hours after this point may still change and are never marked as covered.
+    settled -= settled % 3600  # Aligned to the hour, so the unsettled tail is the same request (and a cache hit) for the whole hour.
+
+    for gap_start, gap_end in store.missing_ranges(lat, lon, units, start, end):  # Fetches each missing part of the range.
+        df, failed_windows = backfill_with_failures(lat, lon, gap_start, gap_end, api_key, units=units, timeout=timeout)
+        if failed_windows:  # Keeps the hours that did arrive, but leaves the range uncovered so it is fetched again next time.
+            store.write(lat, lon, units, df)
+        elif min(gap_end, settled) > gap_start:  # Marks the gap as covered, except for the hours that are still settling.
+            store.write(lat, lon, units, df, gap_start, min(gap_end, settled))
+        elif not df.empty and not _already_stored(store, lat, lon, units, df):  # The whole gap is still settling: stores the hours but keeps fetching them.
+            store.write(lat, lon, units, df)
+
+    return store.read_range(lat, lon, units, start, end)  # Serves the whole range from the memory-mapped store.
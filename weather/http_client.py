@@ -0,0 +1,171 @@
+import threading  # Used to keep the counters consistent when several threads share the client.
+import time  # Used to measure how long each request takes and to wait between retries.
+
+import requests  # 'requests' provides the pooled, keep-alive session used by default.
+from requests.adapters import HTTPAdapter  # Adapter that owns the connection pools of a session.
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool  # Connection pools wrapped to count new connections.
+from urllib3.util.retry import Retry  # Retry policy with exponential backoff.
+
+from weather import config  # Shared settings (pool size, retries, timeouts).
+from weather.rate_limit import get_rate_limiter  # Global limit on how fast requests are sent to the API.
+
+try:  # 'httpx' is optional and only needed for HTTP/2.
+    import httpx
+except ImportError:  # Without it the client falls back to HTTP/1.1 keep-alive connections.
+    httpx = None
+
+# Status codes that are worth retrying: rate limiting and temporary server errors.
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+# --- Task: Counting new connections opened by the pool ---
+
+def _counting_pool(base_class, on_new_connection):  # Builds a connection pool class that reports every new connection it opens.
+    class CountingConnection(base_class.ConnectionCls):
+        def connect(self):  # Called only when a new socket is opened, not when a keep-alive connection is reused.
+            on_new_connection()
+            return super().connect()
+
+    class CountingPool(base_class):
+        ConnectionCls = CountingConnection
+
+    return CountingPool
+
+
+class _CountingAdapter(HTTPAdapter):  # HTTP adapter whose pools report new connections to the client.
+    def __init__(self, on_new_connection, **kwargs):
+        self._on_new_connection = on_new_connection  # Stored before the parent constructor creates the pool manager.
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):  # Swaps in the counting pool classes whenever the pool manager is created.
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self._on_new_connection),
+            "https": _counting_pool(HTTPSConnectionPool, self._on_new_connection),
+        }
+
+
+# --- Task: Shared HTTP client with connection pooling, retries and timeouts ---
+
+class WeatherClient:  # Pooled HTTP client shared by every weather fetcher.
+    def __init__(self, pool_size=None, retries=None, backoff_factor=None, timeout=None, http2=None, rate_limiter=None):
+        self.pool_size = pool_size or config.HTTP_POOL_SIZE  # Number of keep-alive connections kept open per host.
+        self.retries = config.HTTP_RETRIES if retries is None else retries  # Number of retries after a failed request.
+        self.backoff_factor = config.HTTP_BACKOFF_FACTOR if backoff_factor is None else backoff_factor  # Base delay between retries.
+        self.timeout = timeout or config.REQUEST_TIMEOUT  # Default timeout for requests that do not pass their own.
+        self.rate_limiter = rate_limiter or get_rate_limiter()  # Every request sent upstream waits for a token here; cache hits never reach the client.
+        self._lock = threading.Lock()  # Protects the counters below.
+        self._requests = 0  # Number of requests sent through the client.
+        self._connections_opened = 0  # Number of new TCP connections opened.
+        self._errors = 0  # Number of requests that raised an exception.
+        self._request_seconds = 0.0  # Total time spent waiting for responses.
+
+        http2 = config.HTTP2_ENABLED if http2 is None else http2  # Whether HTTP/2 was requested.
+        self.http2 = False  # Set to True below only if HTTP/2 is actually available.
+        if http2:
+            if httpx is None:
+                print("HTTP/2 requested but 'httpx' is not installed; falling back to HTTP/1.1")
+            else:
+                try:
+                    self._session = self._build_httpx_client()  # Fails if the 'h2' package is missing.
+                    self.http2 = True
+                except ImportError:
+                    print("HTTP/2 requested but 'httpx[http2]' is not installed; falling back to HTTP/1.1")
+
+        if not self.http2:
+            self._session = self._build_requests_session()
+
+    def _build_requests_session(self):  # Creates a 'requests' session with a pooled, retrying adapter.
+        retry = Retry(
+            total=self.retries,  # Maximum number of retries across all error types.
+            backoff_factor=self.backoff_factor,  # Waits backoff_factor * 2 ** (retry - 1) seconds between retries.
+            status_forcelist=RETRY_STATUS_CODES,  # Retries on rate limiting and temporary server errors.
+            allowed_methods=frozenset(["GET"]),  # Only idempotent requests are retried.
+            raise_on_status=False,  # Returns the last response instead of raising once retries run out.
+        )
+        adapter = _CountingAdapter(self._count_new_connection, pool_connections=4, pool_maxsize=self.pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _build_httpx_client(self):  # Creates an 'httpx' client that multiplexes requests over HTTP/2 connections.
+        limits = httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+        transport = httpx.HTTPTransport(http2=True, limits=limits, retries=self.retries)  # Retries connection failures.
+        return httpx.Client(http2=True, transport=transport, timeout=self.timeout)
+
+    def _count_new_connection(self):  # Called whenever the pool has to open a new connection.
+        with self._lock:
+            self._connections_opened += 1
+
+    def _trace(self, event_name, info):  # 'httpx' trace hook used to count new connections.
+        if event_name == "connection.connect_tcp.complete":
+            self._count_new_connection()
+
+    def get(self, url, params=None, timeout=None):  # Sends a GET request and returns the response.
+        timeout = timeout or self.timeout
+        self.rate_limiter.acquire()  # The single place the API rate limit is enforced, whichever fetcher or thread calls.
+        started = time.perf_counter()  # Measured after the wait, so the timings only cover the request itself.
+        try:
+            if self.http2:
+                response = self._get_httpx(url, params, timeout)
+            else:
+                response = self._session.get(url, params=params, timeout=timeout)
+        except Exception:
+            with self._lock:
+                self._requests += 1
+                self._errors += 1
+                self._request_seconds += time.perf_counter() - started
+            raise
+
+        with self._lock:
+            self._requests += 1
+            self._request_seconds += time.perf_counter() - started
+        return response
+
+    def _get_httpx(self, url, params, timeout):  # Sends a request over HTTP/2, retrying on retryable status codes.
+        for attempt in range(self.retries + 1):
+            response = self._session.get(url, params=params, timeout=timeout, extensions={"trace": self._trace})
+            if response.status_code not in RETRY_STATUS_CODES or attempt == self.retries:
+                return response
+            time.sleep(self.backoff_factor * (2 ** attempt))  # Exponential backoff before the next attempt.
+
+    def stats(self):  # Returns the counters used to confirm that connections are being reused.
+        with self._lock:
+            requests_sent = self._requests
+            return {
+                "http2": self.http2,
+                "requests": requests_sent,
+                "connections_opened": self._connections_opened,
+                "connections_reused": max(requests_sent - self._connections_opened, 0),
+                "errors": self._errors,
+                "request_seconds_total": round(self._request_seconds, 6),
+                "request_ms_avg": round(self._request_seconds * 1000 / requests_sent, 3) if requests_sent else 0.0,
+            }
+
+    def close(self):  # Closes every pooled connection.
+        self._session.close()
+
+
+# --- Task: One client per process, shared by all fetchers ---
+
+_client = None  # The shared client, created on first use.
+_client_lock = threading.Lock()  # Makes sure only one client is created when several threads start at once.
+
+
+def get_client():  # Returns the shared client, creating it from the settings in 'config' on first use.
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = WeatherClient()
+    return _client
+
+
+def configure_client(**kwargs):  # Replaces the shared client, e.g. configure_client(pool_size=32, http2=True).
+    global _client
+    with _client_lock:
+        old_client, _client = _client, WeatherClient(**kwargs)
+    if old_client is not None:
+        old_client.close()  # Releases the connections held by the previous client.
+    return _client
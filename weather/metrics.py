@@ -0,0 +1,142 @@
+import functools  # Used to keep the name and signature of timed callbacks.
+import threading  # Histograms are updated from many request threads at once.
+import time  # Used to time each stage.
+from contextlib import contextmanager  # Used to time a block of code with a 'with' statement.
+
+# Upper bounds (in seconds) of the histogram buckets, from 1 ms to 10 s.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Stages of a dashboard request, in the order they run.
+STAGES = ("fetch", "process", "figure", "serialization", "request")
+
+
+# --- Task: Latency histograms ---
+
+class Histogram:  # Counts observations per bucket, like a Prometheus histogram.
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)  # Upper bound of every bucket; a final '+Inf' bucket catches the rest.
+        self._lock = threading.Lock()  # Protects the counters below.
+        self.reset()
+
+    def reset(self):  # Forgets every observation.
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)  # Observations per bucket (not cumulative).
+            self._sum = 0.0  # Total of all observations.
+            self._max = 0.0  # Largest observation.
+
+    def observe(self, value):  # Records one observation (in seconds).
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._max = max(self._max, value)
+
+    def snapshot(self):  # Returns the count, sum, maximum and cumulative bucket counts at one point in time.
+        with self._lock:
+            counts, total, largest = list(self._counts), self._sum, self._max
+        cumulative, running = [], 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            running += count
+            cumulative.append((bound, running))
+        return {"count": running, "sum": total, "max": largest, "buckets": cumulative}
+
+    def quantile(self, q, snapshot=None):  # Estimates a quantile by interpolating inside its bucket, like PromQL's 'histogram_quantile'.
+        snapshot = snapshot or self.snapshot()
+        if snapshot["count"] == 0:
+            return 0.0
+        rank = q * snapshot["count"]
+        lower, below = 0.0, 0  # Lower bound of the current bucket and observations below it.
+        for bound, cumulative in snapshot["buckets"]:
+            if cumulative >= rank:
+                if bound == float("inf"):  # Beyond the last bucket: the largest observation is the best estimate.
+                    return snapshot["max"]
+                inside = cumulative - below
+                return min(lower + (bound - lower) * (rank - below) / inside, snapshot["max"])
+            lower, below = bound, cumulative
+        return snapshot["max"]
+
+
+# --- Task: One histogram per stage ---
+
+_histograms = {stage: Histogram() for stage in STAGES}  # Time spent in each stage, in seconds.
+_local = threading.local()  # Per-thread state of the request being served.
+
+
+def observe(stage, seconds):  # Records the duration of one stage.
+    _histograms[stage].observe(seconds)
+
+
+@contextmanager
+def stage_timer(stage):  # Times the enclosed block as one run of 'stage'; exceptions are timed too.
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started)
+
+
+def timed_callback(func):  # Marks when a Dash callback returns, so the time Dash then spends serializing its output can be measured.
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.callback_returned = time.perf_counter()
+    return wrapper
+
+
+def start_request():  # Called when an HTTP request starts.
+    _local.request_started = time.perf_counter()
+    _local.callback_returned = None
+
+
+def finish_request():  # Called once the response is ready; records the serialization and total request time.
+    started = getattr(_local, "request_started", None)
+    if started is None:
+        return
+    finished = time.perf_counter()
+    if getattr(_local, "callback_returned", None) is not None:  # Dash encodes the callback output as JSON after it returns.
+        observe("serialization", finished - _local.callback_returned)
+    observe("request", finished - started)
+    _local.request_started = None
+
+
+def reset():  # Clears every histogram, e.g. between two load-test runs.
+    for histogram in _histograms.values():
+        histogram.reset()
+
+
+def stage_summary():  # Returns the count, mean and estimated percentiles of every stage, in milliseconds.
+    summary = {}
+    for stage, histogram in _histograms.items():
+        snapshot = histogram.snapshot()
+        count = snapshot["count"]
+        summary[stage] = {
+            "count": count,
+            "mean_ms": round(snapshot["sum"] / count * 1000, 2) if count else 0.0,
+            "p50_ms": round(histogram.quantile(0.50, snapshot) * 1000, 2),
+            "p95_ms": round(histogram.quantile(0.95, snapshot) * 1000, 2),
+            "p99_ms": round(histogram.quantile(0.99, snapshot) * 1000, 2),
+            "max_ms": round(snapshot["max"] * 1000, 2),
+        }
+    return summary
+
+
+# --- Task: Prometheus text format ---
+
+def _format_bound(bound):  # Formats a bucket bound the way Prometheus expects it.
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def render_prometheus(counters=None):  # Returns the stage histograms (and any extra counters) in the Prometheus text exposition format.
+    lines = ["# HELP weather_stage_duration_seconds Time spent in each stage of a dashboard request.",
+             "# TYPE weather_stage_duration_seconds histogram"]
+    for stage, histogram in _histograms.items():
+        snapshot = histogram.snapshot()
+        for bound, cumulative in snapshot["buckets"]:
+            lines.append(f'weather_stage_duration_seconds_bucket{{stage="{stage}",le="{_format_bound(bound)}"}} {cumulative}')
+        lines.append(f'weather_stage_duration_seconds_sum{{stage="{stage}"}} {snapshot["sum"]}')
+        lines.append(f'weather_stage_duration_seconds_count{{stage="{stage}"}} {snapshot["count"]}')
+    for name, (help_text, value) in (counters or {}).items():  # E.g. cache hits or opened connections.
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
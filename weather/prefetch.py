@@ -0,0 +1,144 @@
+import random  # Used to jitter refreshes.
+import threading  # The scheduler runs in a background thread next to the Dash server.
+import time  # Used to schedule refreshes and measure refresh lag.
+
+from weather import config  # Shared settings (top-K, budget, lead time, jitter).
+from weather.cache import get_cache  # The response cache the fetchers use; refreshed entries are written into it.
+from weather.current_weather import get_weather_by_coordinates  # Current weather fetcher (cached).
+from weather.forecast import get_forecast_by_coordinates  # Forecast fetcher (cached).
+from weather.rate_limit import RateLimiter, get_rate_limiter  # Token buckets: the scheduler's own budget and the global API limit.
+
+# Responses kept warm for every hot city, by name.
+PREFETCHED_FETCHERS = {
+    "current": get_weather_by_coordinates,
+    "forecast": get_forecast_by_coordinates,
+}
+
+
+# --- Task: Refreshing the cache for the most requested cities in the background ---
+
+class PrefetchScheduler:  # Tracks which cities are requested most and refreshes their cached data before it expires.
+    def __init__(self, api_key, top_k=None, calls_per_minute=None, lead_seconds=None, interval_seconds=None,
+                 jitter_seconds=None, units="metric"):
+        self.api_key = api_key  # API key used for the refresh requests.
+        self.top_k = top_k or config.PREFETCH_TOP_K  # Number of cities kept warm.
+        self.lead_seconds = config.PREFETCH_LEAD_SECONDS if lead_seconds is None else lead_seconds  # Refresh this long before expiry.
+        self.interval_seconds = interval_seconds or config.PREFETCH_INTERVAL_SECONDS  # Time between two checks.
+        self.jitter_seconds = config.PREFETCH_JITTER_SECONDS if jitter_seconds is None else jitter_seconds  # Random extra delay.
+        self.units = units  # Units the dashboard fetches in.
+        calls_per_minute = calls_per_minute or config.PREFETCH_CALLS_PER_MINUTE
+        # At most 'calls_per_minute' refreshes per minute in this process, so with N workers the scheduler may use N times
+        # as much. Each refresh still takes a token from the global limiter in the HTTP client, so it counts against the
+        # same upstream quota as the dashboard requests.
+        self.budget = RateLimiter(calls_per_minute, per=60.0)
+
+        self._lock = threading.Lock()  # Protects the counters below; held only briefly on the request path.
+        self._counts = {}  # Decayed query count per location key.
+        self._locations = {}  # Name, latitude and longitude per location key.
+        self._last_decay = time.monotonic()  # When the query counts were last halved.
+        self._thread = None  # The background thread, started on first use.
+        self._stop = threading.Event()  # Set to stop the background thread.
+        self._refreshes = 0  # Successful refreshes.
+        self._failures = 0  # Refreshes that failed.
+        self._skipped_for_budget = 0  # Due refreshes skipped because the budget was used up.
+        self._lag_total = 0.0  # Total seconds refreshes ran after they became due.
+        self._lag_max = 0.0  # Largest refresh lag seen.
+        self._expired_refreshes = 0  # Refreshes that found the entry already expired (lag unknown).
+        self._last_run = None  # Time of the last completed check.
+
+    # --- Request path ---
+
+    def record_query(self, city, lat, lon):  # Counts a dashboard request for a city; cheap enough to call from a callback.
+        key = (round(lat, 4), round(lon, 4))  # Different spellings of the same city share one entry.
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0.0) + 1.0
+            self._locations[key] = (city, lat, lon)
+        self.start()  # Starts the scheduler in the process that serves requests.
+
+    # --- Background thread ---
+
+    def start(self):  # Starts the background thread if it is not running yet.
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="weather-prefetch", daemon=True)
+                self._thread.start()
+
+    def stop(self):  # Asks the background thread to stop after its current check.
+        self._stop.set()
+
+    def _run(self):  # Main loop of the background thread.
+        while not self._stop.wait(self.interval_seconds + random.uniform(0, self.jitter_seconds)):  # Sleeps a jittered interval between checks.
+            try:
+                self.run_once()
+            except Exception as exc:  # A failed check must never stop the scheduler.
+                print(f"Error in weather prefetch scheduler: {exc}")
+
+    def hot_locations(self):  # Returns the top-K locations as (key, name, lat, lon), most requested first.
+        with self._lock:
+            if time.monotonic() - self._last_decay >= config.PREFETCH_DECAY_SECONDS:  # Halves old counts so the list follows current traffic.
+                self._counts = {key: count / 2 for key, count in self._counts.items() if count / 2 >= 0.5}
+                self._locations = {key: self._locations[key] for key in self._counts}
+                self._last_decay = time.monotonic()
+            ranked = sorted(self._counts, key=self._counts.get, reverse=True)[:self.top_k]
+            return [(key,) + self._locations[key] for key in ranked]
+
+    def run_once(self):  # Refreshes every hot response that is due, within the budget.
+        due = []  # Initializes an empty list to store the refreshes that are due, with the seconds left before expiry.
+        for key, city, lat, lon in self.hot_locations():
+            for kind, fetcher in PREFETCHED_FETCHERS.items():
+                remaining = fetcher.expires_in(lat, lon, self.api_key, units=self.units)  # None if the entry is missing or expired.
+                if remaining is None or remaining <= self.lead_seconds + random.uniform(0, self.jitter_seconds):  # Jitter spreads refreshes of entries cached together.
+                    due.append((remaining, city, lat, lon, kind, fetcher))
+
+        due.sort(key=lambda item: -1 if item[0] is None else item[0])  # Refreshes the entries closest to expiry first.
+        for remaining, city, lat, lon, kind, fetcher in due:
+            if not self.budget.try_acquire():  # Never waits: the rest is skipped until the budget refills.
+                with self._lock:
+                    self._skipped_for_budget += 1
+                continue
+            try:
+                data = fetcher.refresh(lat, lon, self.api_key, units=self.units)  # Calls the API (waiting for the global limiter) and writes the response into the shared cache.
+            except Exception as exc:
+                print(f"Error prefetching {kind} data for {city}: {exc}")
+                data = None
+            if data is None:  # An exception, or an HTTP error the fetcher reported as None (nothing was cached).
+                with self._lock:
+                    self._failures += 1
+                continue
+            with self._lock:
+                self._refreshes += 1
+                if remaining is None:
+                    self._expired_refreshes += 1
+                else:
+                    lag = max(0.0, self.lead_seconds - remaining)  # Seconds between becoming due and being refreshed.
+                    self._lag_total += lag
+                    self._lag_max = max(self._lag_max, lag)
+
+        with self._lock:
+            self._last_run = time.time()
+
+    # --- Status ---
+
+    def stats(self):  # Returns the hit rate, refresh lag and budget use for the status endpoint.
+        hot = self.hot_locations()
+        budget = self.budget.stats()
+        with self._lock:
+            timed_refreshes = self._refreshes - self._expired_refreshes
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "tracked_locations": len(self._counts),
+                "hot_locations": [{"city": city, "lat": lat, "lon": lon, "queries": round(self._counts.get(key, 0.0), 2)} for key, city, lat, lon in hot],
+                "cache": get_cache().stats(),
+                "refreshes": self._refreshes,
+                "failures": self._failures,
+                "refreshes_after_expiry": self._expired_refreshes,
+                "refresh_lag_seconds_avg": round(self._lag_total / timed_refreshes, 3) if timed_refreshes else 0.0,
+                "refresh_lag_seconds_max": round(self._lag_max, 3),
+                "budget_calls_per_minute": budget["rate"],
+                "budget_used_last_minute": round(budget["rate"] - budget["available"], 1),
+                "budget_skipped_refreshes": self._skipped_for_budget,
+                "api_rate_limit": get_rate_limiter().stats(),  # The process-wide limiter the refreshes share with the dashboard.
+                "last_run": self._last_run,
+            }
@@ -0,0 +1,39 @@
+import numpy as np  # 'numpy' is used to build typed columns from the API entries in bulk.
+import pandas as pd  # 'pandas' is used to structure the columns into a DataFrame.
+
+# --- Task: Column layout shared by forecast and historical weather DataFrames ---
+
+# Fields read from each entry's 'main' section, with the type of the resulting column.
+MAIN_COLUMNS = {
+    "temp": np.float32,  # Average temperature.
+    "feels_like": np.float32,  # Perceived temperature.
+    "temp_min": np.float32,  # Minimum temperature.
+    "temp_max": np.float32,  # Maximum temperature.
+    "humidity": np.int64,  # Humidity in percent.
+    "pressure": np.int64,  # Atmospheric pressure in hPa.
+}
+
+# Optional fields read from other sections, as (section, field, column name); missing values become NaN.
+EXTRA_COLUMNS = (
+    ("wind", "speed", "wind_speed"),  # Wind speed.
+    ("wind", "deg", "wind_deg"),  # Wind direction in degrees.
+    ("clouds", "all", "clouds"),  # Cloudiness in percent.
+)
+
+
+# --- Task: Converting a list of API entries into a typed DataFrame ---
+
+def entries_to_frame(entries):  # Turns forecast or history entries into one DataFrame, building each column in a single pass.
+    count = len(entries)  # Number of rows, so numpy can allocate every column up front.
+    mains = [entry['main'] for entry in entries]  # The 'main' section of every entry.
+
+    timestamps = np.fromiter((entry['dt'] for entry in entries), dtype=np.int64, count=count)  # Unix timestamps of every entry.
+    columns = {"datetime": pd.to_datetime(timestamps, unit='s', utc=True)}  # Converts all timestamps to UTC datetimes at once.
+
+    for name, dtype in MAIN_COLUMNS.items():  # Builds the temperature, humidity and pressure columns.
+        columns[name] = np.fromiter((main[name] for main in mains), dtype=dtype, count=count)
+
+    for section, field, name in EXTRA_COLUMNS:  # Builds the wind and cloud columns.
+        columns[name] = np.fromiter((entry.get(section, {}).get(field, np.nan) for entry in entries), dtype=np.float32, count=count)
+
+    return pd.DataFrame(columns)  # Returns the DataFrame with one row per entry.
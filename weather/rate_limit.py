@@ -0,0 +1,70 @@
+import threading  # Used to keep the token count consistent across threads.
+import time  # Used to refill tokens and to wait for the next one.
+
+from weather import config  # Shared settings (global API call rate).
+
+# --- Task: Token bucket limiting how fast requests are sent upstream ---
+
+class RateLimiter:  # Allows 'rate' calls per 'per' seconds on average, with bursts of up to 'burst' calls.
+    def __init__(self, rate, per=1.0, burst=None):
+        self.rate = float(rate)  # Number of calls allowed per period.
+        self.per = float(per)  # Length of the period in seconds.
+        self.capacity = float(burst or rate)  # Maximum number of calls that can be made back to back.
+        self._tokens = self.capacity  # Calls that can be made right now.
+        self._updated = time.monotonic()  # When the token count was last refilled.
+        self._lock = threading.Lock()  # Protects the token count.
+        self._acquired = 0  # Total number of calls let through.
+        self._waited = 0.0  # Total time callers spent waiting for a token.
+
+    def _refill(self):  # Adds the tokens earned since the last refill (called with the lock held).
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate / self.per)
+        self._updated = now
+
+    def try_acquire(self):  # Takes a token if one is available and returns whether it did, without waiting.
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                self._acquired += 1
+                return True
+            return False
+
+    def acquire(self):  # Waits until a token is available, then takes it.
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self._acquired += 1
+                    self._waited += time.monotonic() - started
+                    return
+                delay = (1 - self._tokens) * self.per / self.rate  # Time until the next token is earned.
+            time.sleep(delay)
+
+    def stats(self):  # Returns how many calls went through and how long callers waited.
+        with self._lock:
+            self._refill()
+            return {
+                "rate": self.rate,
+                "per_seconds": self.per,
+                "acquired": self._acquired,
+                "available": round(self._tokens, 3),
+                "waited_seconds_total": round(self._waited, 6),
+            }
+
+
+# --- Task: One limiter per process for all upstream API calls ---
+
+_limiter = None  # The shared limiter, created on first use.
+_limiter_lock = threading.Lock()  # Makes sure only one limiter is created when several threads start at once.
+
+
+def get_rate_limiter():  # Returns the shared limiter, using the rate configured in 'config'.
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(config.API_CALLS_PER_SECOND)
+    return _limiter
@@ -0,0 +1,43 @@
+import copy  # Used to convert payloads without modifying the cached originals.
+
+# Temperature columns of the forecast and history DataFrames.
+TEMPERATURE_COLUMNS = ("temp", "feels_like", "temp_min", "temp_max")
+
+# Wind speed conversion factor from metres per second to miles per hour.
+MPS_TO_MPH = 2.2369363
+
+
+# --- Task: Converting metric data to imperial units locally ---
+
+def convert_temperature(celsius, units="metric"):  # Converts a temperature (or array of temperatures) from Celsius to the chosen units.
+    if units == "imperial":  # Fahrenheit was selected.
+        return celsius * 9 / 5 + 32
+    return celsius  # Metric data is returned unchanged.
+
+
+def convert_speed(metres_per_second, units="metric"):  # Converts a wind speed from m/s to the chosen units.
+    if units == "imperial":  # Miles per hour were selected.
+        return metres_per_second * MPS_TO_MPH
+    return metres_per_second  # Metric data is returned unchanged.
+
+
+def convert_frame(df, units="metric"):  # Converts the temperature and wind columns of a forecast or history DataFrame.
+    if units != "imperial":
+        return df
+    df = df.copy()  # Leaves the metric DataFrame untouched.
+    for column in TEMPERATURE_COLUMNS:
+        if column in df:
+            df[column] = convert_temperature(df[column], units)
+    if "wind_speed" in df:
+        df["wind_speed"] = convert_speed(df["wind_speed"], units)
+    return df
+
+
+def convert_current_weather(weather_data, units="metric"):  # Converts a current weather payload fetched in metric units.
+    if units != "imperial":
+        return weather_data
+    weather_data = copy.deepcopy(weather_data)  # Leaves the cached payload untouched.
+    for field in TEMPERATURE_COLUMNS:
+        weather_data['main'][field] = round(convert_temperature(weather_data['main'][field], units), 2)
+    weather_data['wind']['speed'] = round(convert_speed(weather_data['wind']['speed'], units), 2)
+    return weather_data